@@ -0,0 +1,57 @@
+# Description: Tests of the export command line
+# No display is needed
+#
+#   python -m pytest -q
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import tkmakerCli
+import tkmakerCodegen
+import tkmakerProject
+from tkmakerModel import Document, LAYOUT_PACK
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.document = Document()
+        self.document.addNode("Button", "btn", None, LAYOUT_PACK, {"text": "Ok"})
+
+    def path(self, *names):
+        return os.path.join(self.directory.name, *names)
+
+    def export(self, *files):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+            code = tkmakerCli.main(["export", *files, "-o", self.path("out"), "-j", "1"])
+        return code, stderr.getvalue()
+
+    def test_export(self):
+        tkmakerProject.saveProject(self.document, self.path("design.tkm"))
+        self.assertEqual(self.export(self.path("design.tkm"), self.path("design.tkm")), (0, ""))
+        self.assertEqual(os.listdir(self.path("out")), ["design.py"])
+
+    def test_same_output(self):
+        #two files exported to the same file: nothing is written
+        os.makedirs(self.path("a"))
+        os.makedirs(self.path("b"))
+        tkmakerProject.saveProject(self.document, self.path("a", "x.tkm"))
+        tkmakerProject.saveProject(self.document, self.path("b", "x.tkm"))
+        tkmakerProject.saveProject(self.document, self.path("p.tkm"))
+        tkmakerCodegen.writeCode(self.document, self.path("p.py"), "BACKUP")
+        for files in ([self.path("a", "x.tkm"), self.path("b", "x.tkm")], [self.path("p.tkm"), self.path("p.py")]):
+            with self.subTest(files):
+                code, errors = self.export(*files)
+                self.assertEqual(code, 1)
+                self.assertIn("same file", errors)
+                self.assertFalse(os.path.exists(self.path("out")) and os.listdir(self.path("out")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+# Description: Tests of the code generation, the generated code is read back by tkmakerBackup
+# No display is needed: the code is parsed, not run
+#
+#   python -m pytest -q
+
+import ast
+import os
+import stat
+import sys
+import tempfile
+import tkinter
+import unittest
+
+import tkmakerBackup
+import tkmakerCodegen
+import tkmakerProject
+from tkmakerModel import Document, LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK, LAYOUT_TAB
+
+
+# -----------------------------------------------------------------------------------------------
+# Design with options shared by tk and ttk widgets, and a Notebook
+# -----------------------------------------------------------------------------------------------
+def sampleDocument():
+    document = Document()
+    frame = document.addNode("Frame", "frm", None, LAYOUT_PACK, {"background": "red"}, {"side": "left"})
+    for i in range(4):
+        document.addNode("Label", "lbl" + str(i), frame, LAYOUT_GRID,
+                         {"background": "blue", "font": "Arial 10", "text": "x" + str(i)}, {"row": str(i + 1)})
+    for i in range(3):
+        document.addNode("Entry", "ent" + str(i), frame, LAYOUT_PACK, {"width": "20", "cursor": "hand2", "relief": "flat"})
+    document.addNode("Entry", "ent9", frame, LAYOUT_PACK, {"cursor": "hand2"})
+    for i in range(3):
+        document.addNode("Combobox", "cbx" + str(i), frame, LAYOUT_PACK, {"width": "20", "cursor": "hand2", "values": "a b"})
+    notebook = document.addNode("Notebook", "nbk", None, LAYOUT_PLACE, {}, {"x": "10"})
+    for i in range(3):
+        tab = document.addNode("Frame", "tab" + str(i), notebook, LAYOUT_TAB, {},
+                               {"text": "Tab " + str(i), "padding": "4", "sticky": "nsew", "underline": "0"})
+        document.addNode("Button", "btn" + str(i), tab, LAYOUT_PACK, {"text": "class", "class": "Special"})
+    return document
+
+
+class RoundTripTest(unittest.TestCase):
+
+    def assertRoundTrip(self, document, mode, lazyTabs=False):
+        code = tkmakerCodegen.generateCode(document, mode, lazyTabs)
+        compile(code, "<generated>", "exec")
+        loaded = tkmakerBackup.documentFromRecords(tkmakerBackup.parseBackup(code))
+        self.assertEqual(tkmakerProject.documentToData(loaded), tkmakerProject.documentToData(document))
+        return code
+
+    def test_backup(self):
+        self.assertRoundTrip(sampleDocument(), "BACKUP")
+
+    def test_export(self):
+        code = self.assertRoundTrip(sampleDocument(), "EXPORT")
+        self.assertIn("option_add", code)
+        self.assertIn("**options", code)
+
+    def test_export_lazy_tabs(self):
+        self.assertRoundTrip(sampleDocument(), "EXPORT", True)
+
+    def test_aliases_written_once(self):
+        #bg and background are the same option, the document only keeps background
+        document = Document()
+        document.addNode("Label", "lbl", None, LAYOUT_PACK, {"bg": "red", "fg": "white"})
+        code = self.assertRoundTrip(document, "EXPORT")
+        self.assertIn("tk.Label(self.root, background='red', foreground='white')", code)
+
+    def test_ttk_constructors_take_only_the_master(self):
+        #the ttk constructors are (master=None, **kw), a second positional argument fails
+        for lazyTabs in (False, True):
+            code = tkmakerCodegen.generateCode(sampleDocument(), "EXPORT", lazyTabs)
+            for node in ast.walk(ast.parse(code)):
+                if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+                   and isinstance(node.func.value, ast.Name) and node.func.value.id == "ttk":
+                    self.assertEqual(len(node.args), 1, ast.unparse(node))
+
+    def test_tab_options(self):
+        #all the options of a tab are written, not only its text
+        code = tkmakerCodegen.generateCode(sampleDocument(), "EXPORT")
+        self.assertIn("self.nbk.add(self.tab0, text='Tab 0', padding=4, sticky='nsew', underline=0)", code)
+        code = tkmakerCodegen.generateCode(sampleDocument(), "TCL")
+        self.assertIn(" add $r.nbk.tab0 -text Tab\\ 0 -padding 4 -sticky nsew -underline 0\n", code)
+
+    def test_toplevel_not_managed(self):
+        #place, grid or pack on a Toplevel or a Menu raises TclError
+        document = Document()
+        document.addNode("Toplevel", "top", None, LAYOUT_PACK, {"background": "red"})
+        document.addNode("Menu", "mnu", None, LAYOUT_PACK)
+        for mode in ("EXPORT", "BACKUP", "TCL"):
+            code = tkmakerCodegen.generateCode(document, mode)
+            for method in ("place", "grid", "pack"):
+                self.assertNotIn("top." + method, code)
+                self.assertNotIn("mnu." + method, code)
+                self.assertNotIn(method + " $r.top", code)
+                self.assertNotIn(method + " $r.mnu", code)
+
+
+class TclTest(unittest.TestCase):
+
+    def test_quote(self):
+        #Tcl reads back each value, the control characters are escaped (a raw \r in the script
+        #would be read as \n by Python)
+        interpreter = tkinter.Tcl()
+        for value in ["a\rb", "x\x00y\x7f", "a b\n\tc\x0c", "\u2028", "\u00e9\U0001f600\u20ac", '"""',
+                      "{a} [b] $c \\;", ""]:
+            with self.subTest(value=value):
+                quoted = tkmakerCodegen.tclQuote(value)
+                self.assertTrue(all(character.isprintable() for character in quoted), repr(quoted))
+                self.assertEqual(interpreter.eval("set v " + quoted), value)
+
+    def test_script(self):
+        document = Document()
+        document.addNode("Label", "lbl", None, LAYOUT_PACK, {"text": "a\r\nb\x00"})
+        code = tkmakerCodegen.generateCode(document, "TCL")
+        script = ast.parse(code).body[4]
+        self.assertEqual(script.targets[0].id, "TCL_SCRIPT")
+        self.assertIn("-text a\\u000d\\nb\\u0000\n", script.value.value)
+
+    def test_path_names(self):
+        #a window name can not start with an uppercase letter, and two names never give the same path
+        names = ["abc", "Abc", "_Abc", "__Abc", "_abc"]
+        paths = [tkmakerCodegen.tclPathName(name) for name in names]
+        self.assertEqual(len(set(paths)), len(names))
+        for path in paths:
+            self.assertFalse(path[:1].isupper())
+
+
+class WriteCodeTest(unittest.TestCase):
+
+    def test_content(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "design.py")
+            tkmakerCodegen.writeCode(sampleDocument(), path, "BACKUP")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), tkmakerCodegen.generateCode(sampleDocument(), "BACKUP"))
+            self.assertEqual(os.listdir(directory), ["design.py"])
+
+    @unittest.skipIf(sys.platform == "win32", "no file modes")
+    def test_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "design.py")
+            umask = os.umask(0o022)
+            try:
+                tkmakerCodegen.writeCode(sampleDocument(), path)
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+                #an existing file keeps its mode
+                os.chmod(path, 0o755)
+                tkmakerCodegen.writeCode(sampleDocument(), path)
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o755)
+            finally:
+                os.umask(umask)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+# Description: Tests of the undo/redo history
+# No display is needed: the add and remove changes are applied to the document as the editor does
+#
+#   python -m pytest -q
+
+import unittest
+
+import tkmakerProject
+from tkmakerHistory import History, nodeRecords, changeSize
+from tkmakerModel import Document, LAYOUT_PACK, LAYOUT_TAB
+
+
+# -----------------------------------------------------------------------------------------------
+# The document parts of MainWindow.deleteNodes and MainWindow.restoreNodes
+# -----------------------------------------------------------------------------------------------
+def deleteRecords(document, records):
+    ids = {record[0] for record in records}
+    for record in reversed(records):
+        if record[3] not in ids:
+            document.removeNode(document.nodes[record[0]])
+
+def restoreRecords(document, records):
+    for id, widgetclass, name, parentid, index, layout, options, layoutOptions in records:
+        parent = document.nodes[parentid] if parentid != None else None
+        document.addNode(widgetclass, name, parent, layout, options, layoutOptions, id, index)
+
+def state(document):
+    return tkmakerProject.documentToData(document), [(node.id, node.name) for node in document.walk()]
+
+
+class MergeTest(unittest.TestCase):
+
+    def test_same_option(self):
+        #typing in the property panel gives a single change, from the first value to the last one
+        history = History(10 ** 6, 100)
+        history.record(("option", 1, "text", None, "a"))
+        history.record(("option", 1, "text", "a", "ab"))
+        history.record(("option", 1, "text", "ab", "abc"))
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history.undo(), ("option", 1, "text", None, "abc"))
+        self.assertEqual(history.size, changeSize(("option", 1, "text", None, "abc")))
+
+    def test_back_to_first_value(self):
+        history = History(10 ** 6, 100)
+        history.record(("layout", 1, "padx", "0", "5"))
+        history.record(("layout", 1, "padx", "5", "0"))
+        self.assertEqual(len(history), 0)
+        self.assertEqual(history.size, 0)
+        self.assertEqual(history.undo(), None)
+
+    def test_name(self):
+        history = History(10 ** 6, 100)
+        history.record(("name", 1, "btn", "btn_o"))
+        history.record(("name", 1, "btn_o", "btn_ok"))
+        self.assertEqual(list(history.undoList)[0][0], ("name", 1, "btn", "btn_ok"))
+
+    def test_not_merged(self):
+        changes = [("option", 1, "text", None, "a"), ("option", 1, "width", None, "5"),
+                   ("option", 2, "width", None, "6"), ("layout", 2, "width", None, "7"), ("name", 2, "b", "c")]
+        history = History(10 ** 6, 100)
+        for change in changes:
+            history.record(change)
+        self.assertEqual([change for change, size in history.undoList], changes)
+
+    def test_record_clears_redo(self):
+        history = History(10 ** 6, 100)
+        history.record(("option", 1, "text", None, "a"))
+        history.record(("option", 2, "text", None, "b"))
+        history.undo()
+        self.assertEqual(len(history.redoList), 1)
+        history.record(("option", 3, "text", None, "c"))
+        self.assertEqual(history.redo(), None)
+        self.assertEqual(history.size, sum(size for change, size in history.undoList))
+
+
+class LimitTest(unittest.TestCase):
+
+    def test_max_changes(self):
+        history = History(10 ** 6, 3)
+        for i in range(5):
+            history.record(("option", i, "text", None, str(i)))
+        self.assertEqual([change[1] for change, size in history.undoList], [2, 3, 4])
+        self.assertEqual(history.size, sum(size for change, size in history.undoList))
+
+    def test_max_size(self):
+        change = ("option", 0, "text", None, "x" * 100)
+        history = History(3 * changeSize(change), 100)
+        for i in range(10):
+            history.record(("option", i, "text", None, "x" * 100))
+        self.assertEqual(len(history), 3)
+        self.assertLessEqual(history.size, history.maxsize)
+
+    def test_last_change_kept(self):
+        #a change bigger than the whole history is still kept, alone
+        history = History(10, 100)
+        history.record(("option", 1, "text", None, "a"))
+        history.record(("option", 2, "text", None, "b" * 1000))
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history.undo()[1], 2)
+
+    def test_clear(self):
+        history = History(10 ** 6, 100)
+        history.record(("option", 1, "text", None, "a"))
+        history.record(("option", 2, "text", None, "b"))
+        history.undo()
+        history.clear()
+        self.assertEqual((len(history), history.redoList, history.size), (0, [], 0))
+
+
+class AddRemoveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.document = Document()
+        self.document.addNode("Label", "lbl", None, LAYOUT_PACK, {"text": "Title"})
+        notebook = self.document.addNode("Notebook", "nbk", None, LAYOUT_PACK, {}, {"fill": "both"})
+        for i in range(2):
+            tab = self.document.addNode("Frame", "tab" + str(i), notebook, LAYOUT_TAB, {}, {"text": str(i)})
+            self.document.addNode("Button", "btn" + str(i), tab, LAYOUT_PACK, {"text": "Ok"})
+        self.document.addNode("Entry", "ent", None, LAYOUT_PACK)
+
+    def test_remove(self):
+        #the nodes come back with their ids and at their place in their parent
+        before = state(self.document)
+        history = History(10 ** 6, 100)
+        nodes = [self.document.findByName("nbk"), self.document.findByName("ent")]
+        records = nodeRecords(self.document, nodes)
+        self.assertEqual([record[2] for record in records], ["nbk", "tab0", "btn0", "tab1", "btn1", "ent"])
+        deleteRecords(self.document, records)
+        history.record(("remove", records))
+        after = state(self.document)
+        self.assertEqual(len(self.document), 1)
+
+        change = history.undo()
+        restoreRecords(self.document, change[1])
+        self.assertEqual(state(self.document), before)
+        change = history.redo()
+        deleteRecords(self.document, change[1])
+        self.assertEqual(state(self.document), after)
+
+    def test_add(self):
+        before = state(self.document)
+        history = History(10 ** 6, 100)
+        tab = self.document.addNode("Frame", "tab2", self.document.findByName("nbk"), LAYOUT_TAB, {}, {"text": "2"})
+        self.document.addNode("Label", "lbl2", tab, LAYOUT_PACK)
+        history.record(("add", nodeRecords(self.document, [tab])))
+        after = state(self.document)
+
+        change = history.undo()
+        deleteRecords(self.document, change[1])
+        self.assertEqual(state(self.document), before)
+        change = history.redo()
+        restoreRecords(self.document, change[1])
+        self.assertEqual(state(self.document), after)
+
+    def test_middle_node(self):
+        #the Notebook is between the Label and the Entry
+        records = nodeRecords(self.document, [self.document.findByName("nbk")])
+        self.assertEqual(records[0][4], 1)
+        before = state(self.document)
+        deleteRecords(self.document, records)
+        restoreRecords(self.document, records)
+        self.assertEqual(state(self.document), before)
+
+    def test_records_are_copies(self):
+        #a later change of the node does not change the history
+        node = self.document.findByName("ent")
+        records = nodeRecords(self.document, [node])
+        self.document.setOption(node, "width", "5")
+        self.assertEqual(records[0][6], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# Description: Tests of the document model
+# No display is needed
+#
+#   python -m pytest -q
+
+import unittest
+
+from tkmakerModel import Document, LAYOUT_PLACE, LAYOUT_PACK
+
+
+class DocumentTest(unittest.TestCase):
+
+    def test_add_node(self):
+        document = Document()
+        frame = document.addNode("Frame", "frm", None, LAYOUT_PACK, {"bg": "red", "bd": "2"})
+        button = document.addNode("Button", "btn", frame)
+        self.assertEqual((frame.id, button.id), (1, 2))
+        self.assertIs(button.parent, frame)
+        self.assertEqual(frame.children, [button])
+        self.assertEqual(document.roots, [frame])
+        self.assertEqual(button.layout, LAYOUT_PLACE)
+        self.assertIs(document.findByName("btn"), button)
+        self.assertEqual(len(document), 2)
+        #the aliases are stored by the option they stand for
+        self.assertEqual(frame.options, {"background": "red", "borderwidth": "2"})
+
+    def test_full_name_wins(self):
+        document = Document()
+        node = document.addNode("Label", "lbl", None, LAYOUT_PACK, {"bg": "red", "background": "blue"})
+        self.assertEqual(node.options, {"background": "blue"})
+        document.setOption(node, "fg", "white")
+        self.assertEqual(node.options, {"background": "blue", "foreground": "white"})
+        document.setOption(node, "bg", None)
+        self.assertEqual(node.options, {"foreground": "white"})
+
+    def test_index(self):
+        document = Document()
+        first = document.addNode("Label", "a")
+        last = document.addNode("Label", "c")
+        middle = document.addNode("Label", "b", index=1)
+        self.assertEqual(document.roots, [first, middle, last])
+        self.assertEqual([node.name for node in document.walk()], ["a", "b", "c"])
+
+    def test_ids_not_reused(self):
+        document = Document()
+        frame = document.addNode("Frame", "frm")
+        document.addNode("Button", "btn", frame)
+        document.removeNode(frame)
+        self.assertEqual((len(document), document.names, document.roots), (0, {}, []))
+        self.assertEqual(document.addNode("Label", "lbl").id, 3)
+        #a node restored with its id (undo) keeps it, the next ids follow it
+        self.assertEqual(document.addNode("Frame", "frm", id=7).id, 7)
+        self.assertEqual(document.addNode("Label", "lbl2").id, 8)
+
+    def test_versions(self):
+        document = Document()
+        node = document.addNode("Label", "lbl")
+        version = node.version
+        document.setOption(node, "text", "Ok")
+        self.assertGreater(node.version, version)
+        self.assertEqual(document.version, node.version)
+        document.rename(node, "lbl_ok")
+        self.assertEqual(document.version, node.version)
+        self.assertEqual(list(document.names), ["lbl_ok"])
+
+    def test_unique_name(self):
+        document = Document()
+        self.assertEqual(document.uniqueName("Button"), "Button1")
+        document.addNode("Button", "Button1")
+        document.addNode("Button", "Button2")
+        self.assertEqual(document.uniqueName("Button"), "Button3")
+        #the names reserved by a batch being added are skipped too
+        self.assertEqual(document.uniqueName("Button", {"Button3", "Button4"}), "Button5")
+
+    def test_unique_name_after_rename(self):
+        document = Document()
+        node = document.addNode("Button", "btn")
+        document.rename(node, "Button2")
+        self.assertEqual(document.uniqueName("Button"), "Button3")
+
+    def test_clear(self):
+        document = Document()
+        document.addNode("Frame", "frm")
+        version = document.version
+        document.clear()
+        self.assertEqual((len(document), document.roots, document.names), (0, [], {}))
+        self.assertGreater(document.version, version)
+        self.assertEqual(document.addNode("Frame", "frm").id, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# Description: Tests of the loading of the project files and of the backups
+# No display is needed
+#
+#   python -m pytest -q
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import tkmakerBackup
+import tkmakerCodegen
+import tkmakerProject
+from tkmakerModel import Document, LAYOUT_PACK, LAYOUT_TAB
+
+
+def readWidgets(widgets):
+    data = {"format": tkmakerProject.PROJECT_FORMAT, "version": tkmakerProject.PROJECT_VERSION, "widgets": widgets}
+    return tkmakerProject.readProject(io.StringIO(json.dumps(data)))
+
+
+class ProjectTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        document = Document()
+        notebook = document.addNode("Notebook", "nbk", None, LAYOUT_PACK, {}, {"side": "left"})
+        tab = document.addNode("Frame", "tab", notebook, LAYOUT_TAB, {"background": "red"}, {"text": "Tab"})
+        document.addNode("Button", "btn", tab, LAYOUT_PACK, {"text": "Ok"})
+        data = tkmakerProject.documentToData(document)
+        loaded = tkmakerProject.documentFromData(json.loads(json.dumps(data)))
+        self.assertEqual(tkmakerProject.documentToData(loaded), data)
+
+    def test_invalid_structures(self):
+        invalid = {
+            "not a project": None,
+            "widgets not a list": 5,
+            "children not a list": [{"class": "Frame", "name": "frm", "children": 7}],
+            "unknown class": [{"class": "Window", "name": "w"}],
+            "invalid layout": [{"class": "Button", "name": "b", "layout": 9}],
+            "option list": [{"class": "Button", "name": "b", "options": {"text": [1]}}],
+            "duplicated name": [{"class": "Button", "name": "b"}, {"class": "Label", "name": "b"}],
+            "name not an identifier": [{"class": "Button", "name": "my button"}],
+            "name is a keyword": [{"class": "Button", "name": "class"}],
+            "tab outside of a Notebook": [{"class": "Frame", "name": "frm", "layout": 3,
+                                           "children": [{"class": "Button", "name": "b", "layout": 4}]}],
+            "tab at the root": [{"class": "Button", "name": "b", "layout": 4}],
+            "Notebook child not a tab": [{"class": "Notebook", "name": "nbk", "layout": 3,
+                                          "children": [{"class": "Frame", "name": "tab", "layout": 3}]}],
+            "children of a Button": [{"class": "Button", "name": "b", "layout": 3,
+                                      "children": [{"class": "Label", "name": "l", "layout": 3}]}],
+        }
+        for case, widgets in invalid.items():
+            with self.subTest(case):
+                with self.assertRaises(ValueError):
+                    if widgets == None:
+                        tkmakerProject.readProject(io.StringIO("[]"))
+                    else:
+                        readWidgets(widgets)
+
+    def test_backup_structure(self):
+        #a backup with a widget in a Button is refused too
+        source = tkmakerCodegen.generateCode(Document(), "BACKUP").replace(
+            "        self.widgetnames = {}\n",
+            "        self.widgetnames = {}\n"
+            "        self.btn = tk.Button(self.root)\n"
+            "        self.btn.pack()\n"
+            "        self.lbl = tk.Label(self.btn)\n"
+            "        self.lbl.pack()\n")
+        with self.assertRaises(ValueError):
+            tkmakerBackup.documentFromRecords(tkmakerBackup.parseBackup(source))
+
+    def test_save_failure(self):
+        #a save that fails keeps the previous file
+        document = Document()
+        document.addNode("Button", "btn", None, LAYOUT_PACK, {"text": "Ok"})
+        def failingWrite(document, f):
+            f.write("{")
+            raise OSError("disk full")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "design.tkm")
+            tkmakerProject.saveProject(document, path)
+            with mock.patch.object(tkmakerProject, "writeProject", failingWrite):
+                with self.assertRaises(OSError):
+                    tkmakerProject.saveProject(Document(), path)
+            self.assertEqual(os.listdir(directory), ["design.tkm"])
+            self.assertEqual(tkmakerProject.documentToData(tkmakerProject.loadProject(path)),
+                             tkmakerProject.documentToData(document))
+
+
+if __name__ == "__main__":
+    unittest.main()
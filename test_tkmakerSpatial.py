@@ -0,0 +1,80 @@
+# Description: Tests of the spatial index of the widgets
+# No display is needed
+#
+#   python -m pytest -q
+
+import random
+import unittest
+
+from tkmakerSpatial import SpatialIndex, CELL_SIZE
+
+
+class SpatialIndexTest(unittest.TestCase):
+
+    def test_hit(self):
+        index = SpatialIndex()
+        index.rebuild([("frame", 0, 0, 300, 200), ("button", 50, 50, 100, 30), ("label", 200, 150, 50, 20)])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.hit(60, 60), "button")
+        self.assertEqual(index.hit(10, 10), "frame")
+        self.assertEqual(index.hit(220, 160), "label")
+        self.assertEqual(index.hit(400, 10), None)
+
+    def test_topmost(self):
+        #the last rectangle is drawn over the others
+        index = SpatialIndex()
+        index.rebuild([("a", 0, 0, 100, 100), ("b", 0, 0, 100, 100)])
+        self.assertEqual(index.hit(50, 50), "b")
+
+    def test_edges(self):
+        #x + width and y + height are outside of the rectangle, on the cell boundaries too
+        index = SpatialIndex()
+        index.rebuild([("a", CELL_SIZE - 10, 0, 10, 10)])
+        self.assertEqual(index.hit(CELL_SIZE - 10, 0), "a")
+        self.assertEqual(index.hit(CELL_SIZE - 1, 9), "a")
+        self.assertEqual(index.hit(CELL_SIZE, 0), None)
+        self.assertEqual(index.hit(CELL_SIZE - 1, 10), None)
+
+    def test_empty_rectangle(self):
+        #a widget not drawn yet (size 0) is never hit, but the index accepts it
+        index = SpatialIndex()
+        index.rebuild([("a", 10, 10, 0, 0)])
+        self.assertEqual(index.hit(10, 10), None)
+
+    def test_query(self):
+        index = SpatialIndex()
+        index.rebuild([("frame", 0, 0, 300, 200), ("button", 50, 50, 100, 30), ("label", 200, 150, 50, 20)])
+        self.assertEqual(index.query(40, 40, 260, 180), ["button", "label"])
+        #the region is given by two corners in any order
+        self.assertEqual(index.query(260, 180, 40, 40), ["button", "label"])
+        self.assertEqual(index.query(0, 0, 300, 200), ["frame", "button", "label"])
+        self.assertEqual(index.query(60, 60, 70, 70), [])
+
+    def test_rebuild(self):
+        index = SpatialIndex()
+        index.rebuild([("a", 0, 0, 10, 10)])
+        index.rebuild([("b", 100, 100, 10, 10)])
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.hit(5, 5), None)
+        self.assertEqual(index.hit(105, 105), "b")
+
+    def test_same_as_scan(self):
+        #the index gives the result of a scan of every rectangle
+        generator = random.Random(1)
+        rectangles = [(i, generator.randrange(500), generator.randrange(500), generator.randrange(200), generator.randrange(200))
+                      for i in range(200)]
+        index = SpatialIndex()
+        index.rebuild(rectangles)
+        for i in range(500):
+            x, y = generator.randrange(700), generator.randrange(700)
+            hits = [key for key, rx, ry, width, height in rectangles if rx <= x < rx + width and ry <= y < ry + height]
+            self.assertEqual(index.hit(x, y), hits[-1] if hits else None)
+        for i in range(50):
+            x0, y0, x1, y1 = (generator.randrange(700) for j in range(4))
+            inside = [key for key, x, y, width, height in rectangles
+                      if x >= min(x0, x1) and y >= min(y0, y1) and x + width <= max(x0, x1) and y + height <= max(y0, y1)]
+            self.assertEqual(index.query(x0, y0, x1, y1), inside)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# Description: Tests of the layout templates
+# No display is needed: the specs are added to a document as MainWindow.add_widgets does
+#
+#   python -m pytest -q
+
+import unittest
+
+import tkmakerProject
+import tkmakerTemplates
+from tkmakerModel import Document, LAYOUT_PLACE, LAYOUT_PACK, LAYOUT_TAB
+
+
+def addSpecs(document, specs):
+    for spec in specs:
+        parent = document.findByName(spec["parent"]) if spec["parent"] != None else None
+        tkmakerProject.checkNode(spec["type"], spec["name"], parent, spec["layout"])
+        document.addNode(spec["type"], spec["name"], parent, spec["layout"], spec["options"], spec["layoutOptions"])
+
+
+class TemplateTest(unittest.TestCase):
+
+    def test_templates(self):
+        #every template of the menu is valid and its parents come before their children
+        for name in tkmakerTemplates.templates:
+            with self.subTest(name):
+                specs = tkmakerTemplates.getTemplate(name)
+                self.assertTrue(specs)
+                document = Document()
+                addSpecs(document, specs)
+                self.assertEqual(len(document), len(specs))
+
+    def test_cache(self):
+        self.assertIs(tkmakerTemplates.getTemplate("Form"), tkmakerTemplates.getTemplate("Form"))
+
+    def test_order(self):
+        specs = tkmakerTemplates.buildSpecs(tkmakerTemplates.headerTemplate())
+        self.assertEqual([(spec["name"], spec["parent"]) for spec in specs],
+                         [("frm_header", None), ("lbl_title", "frm_header"), ("frm_body", None)])
+
+    def test_instantiate(self):
+        #the names already used get a number, the children follow their renamed parent
+        document = Document()
+        addSpecs(document, tkmakerTemplates.instantiate("Header", document))
+        specs = tkmakerTemplates.instantiate("Header", document)
+        self.assertEqual([(spec["name"], spec["parent"]) for spec in specs],
+                         [("frm_header_1", None), ("lbl_title_1", "frm_header_1"), ("frm_body_1", None)])
+        addSpecs(document, specs)
+        specs = tkmakerTemplates.instantiate("Footer", document)
+        self.assertEqual([spec["name"] for spec in specs], ["frm_body_2", "frm_footer", "lbl_status"])
+        #the cached specs are not changed
+        self.assertEqual(tkmakerTemplates.getTemplate("Header")[0]["name"], "frm_header")
+
+    def test_invalid(self):
+        invalid = {
+            "unknown class": [("Window", "w", LAYOUT_PACK, {}, {}, [])],
+            "duplicated name": [("Frame", "frm", LAYOUT_PACK, {}, {}, [("Label", "frm", LAYOUT_PACK, {}, {}, [])])],
+            "children of a Button": [("Button", "btn", LAYOUT_PACK, {}, {}, [("Label", "lbl", LAYOUT_PACK, {}, {}, [])])],
+            "mixed layouts": [("Label", "a", LAYOUT_PACK, {}, {}, []), ("Label", "b", LAYOUT_PLACE, {}, {}, [])],
+            "tab at the top": [("Label", "a", LAYOUT_TAB, {}, {}, [])],
+            "Notebook child not a tab": [("Notebook", "nbk", LAYOUT_PACK, {}, {}, [("Frame", "tab", LAYOUT_PACK, {}, {}, [])])],
+        }
+        for case, widgets in invalid.items():
+            with self.subTest(case):
+                with self.assertRaises(ValueError):
+                    tkmakerTemplates.buildSpecs(widgets)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,34 @@
 # Description: A simple tkinter editor
 
+import time
+startTime = time.perf_counter() #used by --profile-startup
+
 import tkinter as tk
 from tkinter import ttk
-from tkinter import messagebox
-from tkinter.filedialog import asksaveasfile
-from tkinter.filedialog import askopenfile
-from tkinter import colorchooser
-import importlib
-from importlib import reload
 import os
+import sys
+from types import SimpleNamespace
 
 # Local imports
 from tkmakerConfig import *
 from tkmakerTooltip import CreateToolTip
-
-widgetList = {} #List of widgets created
-widgetnames = {} #List of widget names
+from tkmakerPropertyPanel import PropertyPanel
+from tkmakerScheduler import RedrawScheduler
+from tkmakerModel import *
+import tkmakerCodegen
+import tkmakerProject
+import tkmakerTemplates
+from tkmakerHistory import History, nodeRecords
+from tkmakerIcons import IconCache
+from tkmakerSpatial import SpatialIndex
+from tkmakerSnapshot import OptionSnapshot
+import tkmakerInstrument
+from tkmakerInstrument import instrumented
+from tkmakerProject import PROJECT_EXTENSION, widgetClasses
+
+widgetList = {} #List of widgets created, by node id
+widgetNodes = {} #Document node of each widget, by widget path
+classDefaults = {} #Default options and layout options of each widget class (built once per session)
 currentProjectFile = "" #Current project file
 
 class MainWindow:
@@ -28,11 +41,17 @@ class MainWindow:
         root (tk.Tk): The main application window.
         paramEntryList (dict): Dictionary to store entry widgets for widget parameters.
         layoutEntryList (dict): Dictionary to store entry widgets for layout parameters.
-        selectionFrameList (list): List of frames used to highlight selected widgets.
+        paramPanel (PropertyPanel): Rows of the parameters, kept for each widget class.
+        layoutPanel (PropertyPanel): Rows of the layout options, kept for each layout method.
+        selectionFrameList (list): The four frames used to highlight the selected widget.
+        geometryCache (dict): Coordinates of the widgets relative to the main window.
         widget_type_list (list): List of widget types for the combo box.
-        selectedWidget (tk.Widget): The currently selected widget.
+        selectedWidget (tk.Widget): The currently selected widget (the last one selected).
+        selectedWidgets (list): All the selected widgets, edited together in the panels.
+        scheduler (RedrawScheduler): Refreshes of the editor deferred until Tk is idle.
+        document (Document): Model of the design, kept in sync with the widgets and used for the export.
         LayoutSelection (tk.IntVar): Variable to store the selected layout mode.
-        appicons (dict): Dictionary containing all the icons used in the application.
+        appicons (IconCache): Icons used in the application, decoded when first used.
         frm_structure (tk.Frame): Frame for the widget treeview and controls.
         frm_Dessin (tk.Frame): Frame for drawing widgets.
         frm_param (tk.Frame): Frame for displaying widget parameters.
@@ -50,22 +69,58 @@ class MainWindow:
             Initializes the MainWindow class and sets up the GUI layout and components.
         open_file():
             Opens a file dialog to load a project and initializes the GUI with the loaded data.
+        loadFile(path):
+            Replaces the design with a project (.tkm) or a backup (.py).
+        clearProject():
+            Removes every widget of the current project.
+        loadDocument(document):
+            Creates the widgets and the treeview rows of a document in a single pass.
         export_project():
             Exports the current project as Python code.
         save_project():
-            Saves the current project as a backup.
+            Saves the current project as a TkMaker project (.tkm) or as a backup (.py).
         quit():
             Exits the application.
         addWidget(widget_type=None, widget_name=None, layout_mode=None, parent_widget=None):
             Adds a new widget to the GUI.
+        add_widgets(specs, parent_widget=None):
+            Adds a list of widgets, checked before any is created, with a single refresh.
+        createWidget(node):
+            Creates, configures and places the widget of a document node.
+        insertTreeRow(node):
+            Adds the treeview row of a document node.
+        addTemplate(template_name):
+            Adds a layout of the template collection in the selected Frame.
+        templateIcons():
+            Sets the icons of the templates menu when it is first opened.
+        undo(event=None), redo(event=None):
+            Undoes or redoes the last change of the history.
+        applyChange(change, undo):
+            Applies a change of the history, backwards for undo.
+        showError(message):
+            Displays an error message.
         getPackingMetod(widget):
             Determines the layout method (place, grid, pack) used by a widget.
         removeWidget():
             Removes the currently selected widget.
         highlight_widget(widget):
-            Draws a frame around the selected widget to highlight it.
-        selectionWidget(event):
-            Handles widget selection via a left-click on the widget.
+            Draws a frame around the selected widget to highlight it (when Tk is idle).
+        drawSelection():
+            Moves the selection frames around the highlighted widget.
+        hideSelection():
+            Hides the selection frames.
+        geometryChanged(event):
+            Invalidates the cached coordinates when a widget moves or is resized.
+        clickDispatcher(event):
+            Handles the left-clicks of the application, selects the clicked widget of the design.
+        widgetAt(x, y):
+            Returns the widget of the design at a position of the drawing frame.
+        selectionWidget(widget):
+            Selects a widget of the design (or deselects it if it is already selected).
+        setSelection(widgets):
+            Changes the selected widgets, the last one is the selected widget.
+        startBand(event), moveBand(event), endBand(event):
+            Rubber band selection in the drawing frame.
         chosecolor(event):
             Opens a color picker dialog to select a color for a widget property.
         displayOptions():
@@ -74,20 +129,22 @@ class MainWindow:
             Updates a widget parameter when it is changed.
         changeName(event):
             Updates the name of the selected widget.
+        syncOptions(node, snapshot):
+            Updates the options of a node from a snapshot of its widget.
         changeLayoutParam(event):
             Updates a layout option of the selected widget.
         selectionTree(event):
             Handles widget selection via the treeview.
         generateCode(mode="EXPORT"):
-            Generates Python code for the current GUI design.
+            Generates Python code for the current GUI design (EXPORT, BACKUP or TCL).
+        previewCode():
+            Displays the generated code in a window.
         getDefaultParameters(widget):
             Retrieves the default parameters of a widget.
-        loadWidgetList(widgetparent=None):
-            Loads the list of widgets during project loading.
-        loadWidgetNames():
-            Loads the names of widgets during project loading.
-        loadTreeView():
-            Loads the treeview with the widget hierarchy during project loading.
+        getClassDefaults(widgetclass):
+            Retrieves the cached default options and layout options of a widget class.
+        getLayoutOptions(widget, layoutmode, widgetclass):
+            Retrieves the layout options of a widget that differ from the defaults.
     """
     # -----------------------------------------------------------------------------------------------
     # Class constructor
@@ -99,21 +156,32 @@ class MainWindow:
         self.paramEntryList = {} #List of entry widgets for the parameters
         self.layoutEntryList = {} #List of entry widgets for the layout parameters
         self.selectionFrameList= [] #Liste des cadres de selection qui entourent les widgets
+        self.highlightedWidgets = [] #Widgets surrounded by the selection frames
+        self.scheduler = RedrawScheduler(self.root) #Refreshes done when Tk is idle
+        self.scheduler.register("selection", self.drawSelection)
+        self.scheduler.register("band", self.drawBand)
+        self.band = None #Rubber band in the drawing frame: [x0, y0, x1, y1, additive]
+        self.geometryCache = {} #Coordinates of the widgets relative to the main window
+        self.hitIndex = SpatialIndex() #Rectangles of the widgets in the drawing frame, by node id
+        self.hitIndexStale = True #the index is rebuilt at the next click after a change of the layout
         widget_type_list = [] #Liste des types de widgets pour la combo box
         self.selectedWidget:tk.Widget = None
+        self.selectedWidgets = [] #Selected widgets, the last one is selectedWidget
+        self.displayedOptions = {} #Values displayed in the parameters panel
+        self.displayedLayoutOptions = {} #Values displayed in the layout options panel
+        self.document = Document() #Model of the design
+        self.history = History(historyMaxSize, historyMaxChanges) #Changes that can be undone
         self.LayoutSelection = IntVar()
         self.LayoutSelection.set(1)
+        self.lazyTabs = BooleanVar() #the exported code builds the Notebook tabs when they are selected
 
         # Configuration grid
         self.root.grid_columnconfigure(0, weight=0, minsize=250,pad=0)
         self.root.grid_columnconfigure(1, weight=1,pad=0)
         self.root.grid_rowconfigure(0, weight=1, pad=0)
         
-        # This colletion contains all the icons used in the application
-        self.appicons = {}
-        for file in os.listdir("icons"):
-            if file.endswith(".png"):
-                self.appicons[file.split(".")[0]] = tk.PhotoImage(file=f"icons/{file}")
+        # This colletion contains all the icons used in the application, loaded when first used
+        self.appicons = IconCache(self.root)
         
     
         # left frame for widget treeview and controls
@@ -228,6 +296,7 @@ class MainWindow:
         #Treeview containing the widgets
         self.tree = ttk.Treeview(self.frm_structure, selectmode="extended")
         self.tree.bind("<Button-1>", self.selectionTree)
+        self.tree.bind("<<TreeviewSelect>>", self.treeSelectionChanged)
         self.tree.pack(side=tk.TOP, fill=tk.BOTH, expand=True) 
         self.tree.heading("#0", text="Widgets")
 
@@ -242,10 +311,67 @@ class MainWindow:
         self.menu_file.add_command(label="Save", command=self.save_project)
         self.menu_file.add_separator()
         self.menu_file.add_command(label="Export", command=self.export_project)
+        self.menu_file.add_command(label="Export as Tcl script", command=lambda: self.generateCode(mode="TCL"))
+        self.menu_file.add_checkbutton(label="Build Notebook tabs when selected", variable=self.lazyTabs)
+        self.menu_file.add_command(label="Preview code", command=self.previewCode)
         self.menu_file.add_command(label="Exit", command=self.quit)
         self.menu_bar.add_cascade(label="File", menu=self.menu_file)
+        self.menu_edit = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_edit.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        self.menu_edit.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        self.menu_bar.add_cascade(label="Edit", menu=self.menu_edit)
+        self.root.bind_all("<Control-z>", self.undo)
+        self.root.bind_all("<Control-y>", self.redo)
+        #the icons of the templates are decoded the first time the menu is opened
+        self.menu_templates = tk.Menu(self.menu_bar, tearoff=0, postcommand=self.templateIcons)
+        for name in tkmakerTemplates.templates:
+            self.menu_templates.add_command(label=name, compound=tk.LEFT, command=lambda name=name: self.addTemplate(name))
+        self.menu_bar.add_cascade(label="Templates", menu=self.menu_templates)
+        #the statistics of the calls to Tcl are only available with --instrument
+        if tkmakerInstrument.current != None:
+            self.menu_tools = tk.Menu(self.menu_bar, tearoff=0)
+            self.menu_tools.add_command(label="Tcl statistics", command=lambda: tkmakerInstrument.StatisticsWindow(self.root, tkmakerInstrument.current))
+            self.menu_bar.add_cascade(label="Tools", menu=self.menu_tools)
         self.root.config(menu=self.menu_bar)
 
+        #Selection frames, created once and moved around the selected widget
+        for i in range(4):
+            frame = tk.Frame(self.root, bg="red", borderwidth=0, highlightthickness=0)
+            frame.lift()
+            self.selectionFrameList.append(frame)
+        self.root.bind("<Configure>", self.geometryChanged)
+        #a single binding selects the widgets of the drawing frame, even the ones using the clicks (Entry, Text)
+        self.root.bind_all("<Button-1>", self.clickDispatcher, add="+")
+        #a click on the background of the drawing frame starts a rubber band selection
+        self.frm_Dessin.bind("<Button-1>", self.startBand)
+        self.frm_Dessin.bind("<B1-Motion>", self.moveBand)
+        self.frm_Dessin.bind("<ButtonRelease-1>", self.endBand)
+
+        #Fixed rows of the parameters and layout options panels
+        #they are built once and only shown or hidden by displayOptions
+        self.lbl_no_param = tk.Label(self.frm_param, text="Parameters : No Widget selected" ,bg="#999")
+        self.lbl_no_layout = tk.Label(self.frm_layout_options, text="Layout mode : No Widget selected",bg="#999")
+        #Grey big labl with the mention "Other option"
+        self.lbl_other = tk.Label(self.frm_param, text="Other options",bg="#999")
+        self.lbl_other.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
+        #we display the widget name with an entry widget to change it
+        self.lbl_name = tk.Label(self.frm_param, text="Name")
+        self.lbl_name.grid(row=1, column=0, sticky=tk.W)
+        self.selectedName = tk.StringVar(self.root)
+        self.entry_name = tk.Entry(self.frm_param, textvariable=self.selectedName)
+        self.entry_name.grid(row=1, column=1, sticky=tk.W)
+        self.entry_name.bind("<FocusOut>", self.changeName)
+        self.entry_name_tooltip = CreateToolTip(self.entry_name, text="Change the widget name \n this will be used to have better variables names in the code")
+        #Grey big labl with the mention "Parameters"
+        self.lbl_param = tk.Label(self.frm_param, text="Parameters : ", bg="#999")
+        self.lbl_param.grid(row=2, column=0,columnspan=2,sticky=(tk.W,tk.E))
+        self.lbl_layout = tk.Label(self.frm_layout_options, text="Layout mode : ",anchor="center",bg="#999")
+        self.lbl_layout.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
+        self.paramPanel = PropertyPanel(self.frm_param, 3, listProperties, self.changeParam, self.paramEntryList,
+                                        colorProperties, self.chosecolor)
+        self.layoutPanel = PropertyPanel(self.frm_layout_options, 1, layoutOptions, self.changeLayoutParam, self.layoutEntryList,
+                                         labelwidth=20, entrywidth=25, comboboxwidth=22)
+        self.optionsDisplayed = True
 
         self.displayOptions()
 
@@ -253,43 +379,136 @@ class MainWindow:
     # Function to load a project
     # -----------------------------------------------------------------------------------------------
     def open_file(self):
+        #the dialog is only imported when used
+        from tkinter.filedialog import askopenfilename
         #whe ask the user to select a file
-        pickedfiletypes = [("Python file","*.py")]
-        f = askopenfile( initialdir= os.getcwd(),
+        pickedfiletypes = [("TkMaker project","*" + PROJECT_EXTENSION),("Python file","*.py")]
+        path = askopenfilename( initialdir= os.getcwd(),
                                     title= "Select a file:",
                                     filetypes = pickedfiletypes)
-        if f:
-            #Clearing the parameters and layout options
-            #Parameters
-            for widget in self.frm_param.winfo_children():
-                widget.destroy()
-            self.paramEntryList.clear()
-            #Layout options
-            for widget in self.frm_layout_options.winfo_children():
-                widget.destroy()
-            self.layoutEntryList.clear()
-            #Clearin frm_Dessin
-            for widget in self.frm_Dessin.winfo_children():
-                widget.destroy()
-            #we clear the list of widgets
-            widgetList.clear()
-            #we clear the treeview
-            self.tree.delete(*self.tree.get_children())
-           
-            #we load the file
-            module = importlib.import_module(f.name.split(".")[0].split("/")[-1])
-            #we reload the module   
-            reload(module)
-            #we create an instance of the class
-            my_class = getattr(module, 'Backup')
-            my_instance = my_class(self.frm_Dessin)
-            widgetnames.update(my_instance.widgetnames)
-            
-        
-            self.loadWidgetList()
-            self.loadWidgetNames()
-            self.loadTreeView()
+        if path:
+            self.loadFile(path)
+
+    # -----------------------------------------------------------------------------------------------
+    # Replace the design with a project or a backup, returns False if the file can not be loaded
+    # -----------------------------------------------------------------------------------------------
+    @instrumented("load")
+    def loadFile(self,path):
+        #the backup parser is only imported when used
+        import tkmakerBackup
+        #the file is only read, the widgets are created from the document
+        #TkMaker projects are JSON, .py files are Backup classes parsed without being imported
+        try:
+            if path.endswith(".py"):
+                document = tkmakerBackup.loadBackup(path)
+            else:
+                document = tkmakerProject.loadProject(path)
+        except (OSError, ValueError) as error:
+            self.showError(str(error))
+            return False
+        #the current project is kept (with its history) until the widgets of the file are created
+        previous = Document()
+        for node in self.document.walk():
+            previous.addNode(node.widgetClass, node.name, None if node.parent == None else previous.nodes[node.parent.id],
+                             node.layout, node.options, node.layoutOptions, id=node.id)
+        history = self.history
+        self.history = History(historyMaxSize, historyMaxChanges)
+        self.clearProject()
+        try:
+            self.loadDocument(document)
+        except tk.TclError as error:
+            #an option refused by Tk: the widgets already created are removed and the project restored
+            self.clearProject()
+            self.loadDocument(previous)
+            self.history = history
             self.displayOptions()
+            self.showError("Unable to open %s: %s" % (path, error))
+            return False
+        self.displayOptions()
+        return True
+
+    # -----------------------------------------------------------------------------------------------
+    # Function to remove every widget of the current project
+    # -----------------------------------------------------------------------------------------------
+    def clearProject(self):
+        #Clearing the selection
+        self.selectedWidget = None
+        self.selectedWidgets = []
+        self.hideSelection()
+        self.geometryCache.clear()
+        self.hitIndexStale = True
+        #Clearin frm_Dessin
+        for widget in self.frm_Dessin.winfo_children():
+            widget.destroy()
+        #we clear the list of widgets
+        widgetList.clear()
+        widgetNodes.clear()
+        self.document.clear()
+        self.history.clear()
+        #we clear the treeview
+        self.tree.delete(*self.tree.get_children())
+
+    # -----------------------------------------------------------------------------------------------
+    # Create the widgets of a document (used during the loading of a project)
+    # The nodes are walked parents first, each widget is created, configured, placed and added
+    # to the treeview in the same pass
+    # -----------------------------------------------------------------------------------------------
+    def loadDocument(self,document:Document):
+        self.document = document
+        #the refreshes of the editor are suspended until all the widgets are created
+        with self.scheduler.batch():
+            for node in document.walk():
+                self.createWidget(node)
+                self.insertTreeRow(node)
+
+    # -----------------------------------------------------------------------------------------------
+    # Create the widget of a node, its parent widget must already exist
+    # -----------------------------------------------------------------------------------------------
+    def createWidget(self,node:WidgetNode):
+        if node.parent == None:
+            widgetparent = self.frm_Dessin
+        else:
+            widgetparent = widgetList[node.parent.id]
+        #getting the function to create the widget
+        try:
+            func = getattr(tk, node.widgetClass) # type: ignore
+        except:
+            func = getattr(ttk, node.widgetClass) # type: ignore
+        #the options are given to the constructor, so there is a single call for all of them
+        Wid = func(widgetparent, node.options)
+        #a layout option refused by Tk does not leave a widget outside of the document
+        try:
+            if node.widgetClass in toplevelClasses:
+                pass
+            elif node.layout == LAYOUT_TAB:
+                widgetparent.add(Wid, **node.layoutOptions)
+            elif node.layout == LAYOUT_PLACE:
+                Wid.place({"x": 0, "y": 0, **node.layoutOptions})
+            elif node.layout == LAYOUT_GRID:
+                Wid.grid({"row": 0, "column": 0, **node.layoutOptions})
+            else:
+                Wid.pack(node.layoutOptions)
+        except tk.TclError:
+            Wid.destroy()
+            raise
+
+        widgetList[node.id] = Wid
+        widgetNodes[str(Wid)] = node
+        self.hitIndexStale = True
+        return Wid
+
+    # -----------------------------------------------------------------------------------------------
+    # Add the row of a node to the treeview, after the rows of its siblings by default
+    # -----------------------------------------------------------------------------------------------
+    def insertTreeRow(self,node:WidgetNode,index="end"):
+        self.tree.insert(node.parent.id if node.parent != None else "", index, text=node.name, iid=node.id, image=self.appicons["price-tag-3-fill"])
+
+    # -----------------------------------------------------------------------------------------------
+    # Display an error message, the dialog module is imported with the first message
+    # -----------------------------------------------------------------------------------------------
+    def showError(self,message):
+        from tkinter import messagebox
+        messagebox.showinfo("Error", message)
 
     # -----------------------------------------------------------------------------------------------
     # Function save the final code
@@ -300,8 +519,24 @@ class MainWindow:
     # -----------------------------------------------------------------------------------------------
     # Function to save the project
     # -----------------------------------------------------------------------------------------------
+    @instrumented("export")
     def save_project(self):
-        self.generateCode(mode="BACKUP")
+        from tkinter.filedialog import asksaveasfilename
+        pickedfiletypes = [("TkMaker project","*" + PROJECT_EXTENSION),("Python file","*.py")]
+        path = asksaveasfilename( initialdir= os.getcwd(),
+                                    title= "Enter à file:",
+                                    filetypes = pickedfiletypes,
+                                    defaultextension = PROJECT_EXTENSION)
+        if not path:
+            return
+        try:
+            #a .py file is still saved in the Backup format
+            if path.endswith(".py"):
+                tkmakerCodegen.writeCode(self.document, path, "BACKUP")
+            else:
+                tkmakerProject.saveProject(self.document, path)
+        except OSError as error:
+            self.showError("Unable to save %s: %s" % (path, error))
         
     # -----------------------------------------------------------------------------------------------
     # Function to quit the application
@@ -312,14 +547,15 @@ class MainWindow:
     # -----------------------------------------------------------------------------------------------
     # Function to create a widget this function is called by the add button
     # -----------------------------------------------------------------------------------------------
+    @instrumented("add")
     def addWidget(self,widget_type=None,widget_name=None,layout_mode=None,parent_widget=None):
         
         if widget_name == None:
             widget_name = self.entry_widget_name.get()
-            #we check if the name is unique
-            if  widget_name in widgetnames.values():
-                tk.messagebox.showinfo("Error", "The widget name must be unique")
-                return None
+        #we check if the name is unique
+        if  self.document.hasName(widget_name):
+            self.showError("The widget name must be unique")
+            return None
         
 
         #we get the selected widget type from the combobox
@@ -329,13 +565,8 @@ class MainWindow:
         #we get the selected layout mode
         if layout_mode == None:
             layout_mode = self.LayoutSelection.get() 
+        layout_mode = int(layout_mode)
         
-        #getting the function to create the widget
-        try:
-            func = getattr(tk, widget_type.value) # type: ignore
-        except:
-            func = getattr(ttk, widget_type.value) # type: ignore
-
         if parent_widget == None:
             if self.selectedWidget != None:
                 widgetparent = self.selectedWidget
@@ -343,61 +574,51 @@ class MainWindow:
                 widgetparent = self.frm_Dessin
         else:
             widgetparent = parent_widget
+        parentnode = widgetNodes.get(str(widgetparent))
 
         
         #If the parent is a frame we can add a widget to it
         # if not whe message the user
-        if widgetparent.winfo_class() != "TFrame" and \
-           widgetparent.winfo_class() != "Frame" and \
-           widgetparent.winfo_class() != "TNotebook"   :
-            tk.messagebox.showinfo("Error", "You can only add widgets to a Frame or a Notebook")
+        if parentnode != None and parentnode.widgetClass not in containerClasses:
+            self.showError("You can only add widgets to a Frame or a Notebook")
+            return None
+        intab = parentnode != None and parentnode.widgetClass == "Notebook"
+        if intab and widget_type.value in toplevelClasses:
+            self.showError("A " + widget_type.value + " can not be a tab of a Notebook")
             return None
         
         #Whe check the other widgets of this container to see if the selected layout method is the same
-        if len(widgetparent.children)>0:
-            if self.getPackingMetod(list(widgetparent.children.values())[0])!=self.LayoutSelection.get():
-                tk.messagebox.showinfo("Error", "You must select the same layout method \n than the other widgets of the container")
+        #the layout methods are read from the document, the widgets of a Notebook are tabs
+        #and the windows (Toplevel, Menu) have no layout
+        siblings = parentnode.children if parentnode != None else self.document.roots
+        siblings = [sibling for sibling in siblings if sibling.widgetClass not in toplevelClasses]
+        if not intab and len(siblings)>0:
+            if siblings[0].layout != layout_mode:
+                self.showError("You must select the same layout method \n than the other widgets of the container")
                 return None
-      
-        #we create the widget
-        Wid = func(widgetparent)
-        #quick placing of the widget
-        if widgetparent.winfo_class() == "TNotebook":
-            Wid.pack(fill='both',expand=True)
-        else:
-            if self.LayoutSelection.get() == 1:
-                Wid.place(x=0,y=0)
-            elif self.LayoutSelection.get() == 2:
-                Wid.grid(row=0, column=0)
-            else:
-                Wid.pack()
-        Wid.bind("<Button-1>", self.selectionWidget)
-
-        if widgetparent.winfo_class() == "TNotebook":
-            widgetparent.add(Wid,text=str(Wid.winfo_id()))
 
-        if Wid.keys().__contains__("text"):
-            Wid.config(text=str(Wid.winfo_id()))
-
-        #Adding the widget to the list of widgets
-        widgetList[str(Wid.winfo_id())]=Wid
-
-        #If the has no name we use type + id
+        #If the has no name we use type + number
         if widget_name == "":
-            widget_name = widget_type.value + str(Wid.winfo_id())   
-
+            widget_name = self.document.uniqueName(widget_type.value)
 
-        #Adding the name of the widget the list of widget names
-        widgetnames[str(Wid.winfo_id())]=widget_name
-        
-
-        #Adding the widget to the treeview
-        if widgetparent.winfo_id() == self.frm_Dessin.winfo_id():
-            self.tree.insert("", "end", text=widget_name,iid=Wid.winfo_id(), image=self.appicons["price-tag-3-fill"])
+        #Adding the widget to the document
+        #the widget is created with the default layout options, only the text is changed
+        if intab:
+            node = self.document.addNode(widget_type.value, widget_name, parentnode, LAYOUT_TAB, layoutOptions={"text": widget_name})
         else:
-            self.tree.insert(widgetparent.winfo_id(), "end", text=widget_name,iid=Wid.winfo_id(), image=self.appicons["price-tag-3-fill"])
-        #updating the drawing frame
-        self.frm_Dessin.update()
+            node = self.document.addNode(widget_type.value, widget_name, parentnode, layout_mode)
+        if "text" in self.getClassDefaults(widget_type.value)["options"]:
+            self.document.setOption(node, "text", widget_name)
+      
+        #we create the widget and add it to the treeview, the node is removed if Tk refuses it
+        try:
+            Wid = self.createWidget(node)
+        except tk.TclError as error:
+            self.document.removeNode(node)
+            self.showError(str(error))
+            return None
+        self.insertTreeRow(node)
+        self.history.record(("add", nodeRecords(self.document, [node])))
 
         #clear of the entry from the widget name
         self.entry_widget_name.delete(0,tk.END)
@@ -406,6 +627,144 @@ class MainWindow:
 
         return Wid
 
+    # -----------------------------------------------------------------------------------------------
+    # Add several widgets at once (used by scripts and templates)
+    # specs is a list of (type, name, parent, layout, options) tuples, or of dicts with these keys
+    # and an optional "layoutOptions" dict:
+    #   type: a WidgetType or its value ("Button")
+    #   name: unique name, "" or None to get a generated one
+    #   parent: None for parent_widget (the drawing frame by default), or the name of an existing
+    #           widget or of a widget of an earlier spec
+    #   layout: 1/2/3 or "place"/"grid"/"pack", ignored for the tabs of a Notebook
+    #   options: widget options
+    # All the specs are checked before any widget is created (ValueError), then the widgets are
+    # created with the refreshes suspended and their treeview rows inserted in one pass
+    # A value refused by Tk removes the widgets of the batch already created (ValueError too)
+    # -----------------------------------------------------------------------------------------------
+    @instrumented("add")
+    def add_widgets(self,specs,parent_widget:tk.Widget=None):
+        defaultparent = widgetNodes.get(str(parent_widget)) if parent_widget != None else None
+        planned = [] #checked specs: (widgetclass, name, parent, layout, options, layoutOptions)
+        newclasses = {} #class of the named widgets of the batch
+        layouts = {} #layout method of the children of each container of the batch
+        specs = [dict(spec) if isinstance(spec, dict) else dict(zip(("type", "name", "parent", "layout", "options"), spec)) for spec in specs]
+        #the generated names must not take a name given later in the batch
+        reserved = {spec.get("name") for spec in specs if spec.get("name")}
+        for index, spec in enumerate(specs):
+            widgetclass = spec.get("type")
+            if isinstance(widgetclass, WidgetType):
+                widgetclass = widgetclass.value
+            if widgetclass not in widgetClasses:
+                raise ValueError("spec %d: unknown widget type %r" % (index, widgetclass))
+
+            name = spec.get("name") or None
+            if name != None and (self.document.hasName(name) or name in newclasses):
+                raise ValueError("spec %d: the widget name %r must be unique" % (index, name))
+
+            #the parent is a node of the document or the name of a widget of the batch
+            parent = spec.get("parent")
+            if parent == None:
+                parent = defaultparent
+                parentclass = defaultparent.widgetClass if defaultparent != None else None
+            elif parent in newclasses:
+                parentclass = newclasses[parent]
+            elif self.document.hasName(parent):
+                parent = self.document.findByName(parent)
+                parentclass = parent.widgetClass
+            else:
+                raise ValueError("spec %d: unknown parent %r" % (index, parent))
+            if parentclass != None and parentclass not in containerClasses:
+                raise ValueError("spec %d: you can only add widgets to a Frame or a Notebook" % index)
+
+            #all the children of a container must use the same layout method
+            if parentclass == "Notebook":
+                if widgetclass in toplevelClasses:
+                    raise ValueError("spec %d: a %s can not be a tab of a Notebook" % (index, widgetclass))
+                layout = LAYOUT_TAB
+            else:
+                layout = spec.get("layout", LAYOUT_PLACE)
+                layout = {"place": LAYOUT_PLACE, "grid": LAYOUT_GRID, "pack": LAYOUT_PACK}.get(layout, layout)
+                if layout not in (LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK):
+                    raise ValueError("spec %d: invalid layout %r" % (index, spec.get("layout")))
+                key = parent if isinstance(parent, str) else id(parent)
+                if key not in layouts and widgetclass not in toplevelClasses:
+                    siblings = parent.children if isinstance(parent, WidgetNode) else self.document.roots if parent == None else []
+                    siblings = [sibling for sibling in siblings if sibling.widgetClass not in toplevelClasses]
+                    layouts[key] = siblings[0].layout if len(siblings) > 0 else layout
+                if layouts.get(key, layout) != layout:
+                    raise ValueError("spec %d: the widgets of a container must use the same layout method" % index)
+
+            #the aliases (bg) are given by the option they stand for, as in the document
+            options = canonicalOptions({str(key): str(value) for key, value in (spec.get("options") or {}).items()})
+            defaults = self.getClassDefaults(widgetclass)["options"]
+            for key in options:
+                if key not in defaults:
+                    raise ValueError("spec %d: unknown option %r for %s" % (index, key, widgetclass))
+            layoutOptions = {str(key): str(value) for key, value in (spec.get("layoutOptions") or {}).items()}
+            layoutKeys = tabOptions if layout == LAYOUT_TAB else self.getClassDefaults(widgetclass)[layout]
+            for key in layoutOptions:
+                if key not in layoutKeys:
+                    raise ValueError("spec %d: unknown layout option %r" % (index, key))
+
+            if name != None:
+                newclasses[name] = widgetclass
+            else:
+                name = self.document.uniqueName(widgetclass, reserved)
+                reserved.add(name)
+            planned.append((widgetclass, name, parent, layout, options, layoutOptions))
+
+        #creation of the nodes and of the widgets, then of the treeview rows
+        nodes = []
+        with self.scheduler.batch():
+            try:
+                for widgetclass, name, parent, layout, options, layoutOptions in planned:
+                    if isinstance(parent, str):
+                        parent = self.document.findByName(parent)
+                    if "text" in self.getClassDefaults(widgetclass)["options"] and "text" not in options:
+                        options["text"] = name
+                    if layout == LAYOUT_TAB and "text" not in layoutOptions:
+                        layoutOptions["text"] = name
+                    node = self.document.addNode(widgetclass, name, parent, layout, options, layoutOptions)
+                    nodes.append(node)
+                    self.createWidget(node)
+            except tk.TclError as error:
+                #a value refused by Tk: the batch is all or nothing, the nodes and widgets already created are removed
+                for node in reversed(nodes):
+                    widget = widgetList.pop(node.id, None)
+                    if widget != None:
+                        del widgetNodes[str(widget)]
+                        widget.destroy()
+                    if node.id in self.document.nodes:
+                        self.document.removeNode(node)
+                self.hitIndexStale = True
+                raise ValueError("spec %d: %s" % (len(nodes) - 1, error))
+            for node in nodes:
+                self.insertTreeRow(node)
+        #the whole batch is undone in one step
+        ids = {node.id for node in nodes}
+        self.history.record(("add", nodeRecords(self.document, [node for node in nodes if node.parent == None or node.parent.id not in ids])))
+        return [widgetList[node.id] for node in nodes]
+
+    # -----------------------------------------------------------------------------------------------
+    # Set the icons of the templates menu when it is first opened (postcommand)
+    # -----------------------------------------------------------------------------------------------
+    def templateIcons(self):
+        for index, (icon, function) in enumerate(tkmakerTemplates.templates.values()):
+            self.menu_templates.entryconfigure(index, image=self.appicons[icon])
+        self.menu_templates.configure(postcommand="")
+
+    # -----------------------------------------------------------------------------------------------
+    # Add a layout of the template collection in the selected Frame (or in the drawing frame)
+    # -----------------------------------------------------------------------------------------------
+    def addTemplate(self,template_name):
+        specs = tkmakerTemplates.instantiate(template_name, self.document)
+        try:
+            widgets = self.add_widgets(specs, self.selectedWidget)
+        except ValueError as error:
+            self.showError(str(error))
+            return None
+        return widgets
+
     # -----------------------------------------------------------------------------------------------
     # Function that gets the layout method of a widget
     # -----------------------------------------------------------------------------------------------
@@ -425,114 +784,282 @@ class MainWindow:
     # -----------------------------------------------------------------------------------------------
     # Function to remove a widget this function is called by the remove button
     # -----------------------------------------------------------------------------------------------
+    @instrumented("remove")
     def removeWidget(self):
-        #we check if the widget has children
-        if(len(self.selectedWidget.winfo_children())>0):
-            tk.messagebox.showinfo("Error", "You can only remove a widget if it has no children")
-            return
-
-
-        #we get the selected widget
-        selection = self.selectedWidget
         #if no widget is selected we return
-        if selection == None:
+        if self.selectedWidget == None:
             return
-        
-        #Deleting the widget from the treeview
-        self.tree.delete(selection.winfo_id())
-        id = str(selection.winfo_id())
-        #Deleting the widget from the list of widgets
-        widgetList[id].destroy()
-        del widgetList[id]
-
-       
-        #Deleting the widget from the list of widget names
-        del widgetnames[id] 
+        #we check if the widgets have children
+        for widget in self.selectedWidgets:
+            if(len(widget.winfo_children())>0):
+                self.showError("You can only remove a widget if it has no children")
+                return
+
+        #the removed widgets are kept in the history to be created again by undo
+        #they are recorded in the order of the document, so undo puts them back at their positions
+        order = {node.id: i for i, node in enumerate(self.document.walk())}
+        nodes = sorted((widgetNodes[str(widget)] for widget in self.selectedWidgets), key=lambda node: order[node.id])
+        records = nodeRecords(self.document, nodes)
+        self.history.record(("remove", records))
+        self.deleteNodes(records)
 
         #Clering the parameters and layout options
-        self.selectedWidget = None 
         self.displayOptions()
 
-        #Clearing the selection frame  
-        for frame in self.selectionFrameList:
-            frame.destroy()
-        self.selectionFrameList = []
+    # -----------------------------------------------------------------------------------------------
+    # Delete the widgets of records (see tkmakerHistory) from the treeview, the widgets and the document
+    # -----------------------------------------------------------------------------------------------
+    def deleteNodes(self,records):
+        ids = {record[0] for record in records}
+        self.hitIndexStale = True
+        for record in reversed(records):
+            node = self.document.nodes[record[0]]
+            widget = widgetList.pop(node.id)
+            del widgetNodes[str(widget)]
+            #the children are deleted with their parent
+            if record[3] not in ids:
+                self.tree.delete(node.id)
+                widget.destroy()
+                self.document.removeNode(node)
+        #the deleted widgets are removed from the selection
+        selection = [widget for widget in self.selectedWidgets if str(widget) in widgetNodes]
+        if len(selection) != len(self.selectedWidgets):
+            self.selectedWidgets = selection
+            self.selectedWidget = selection[-1] if selection else None
+            self.highlightSelection()
+
+    # -----------------------------------------------------------------------------------------------
+    # Create again the widgets of records (see tkmakerHistory) with their ids and positions
+    # -----------------------------------------------------------------------------------------------
+    def restoreNodes(self,records):
+        for id, widgetclass, name, parentid, index, layout, options, layoutOptions in records:
+            parent = self.document.nodes[parentid] if parentid != None else None
+            node = self.document.addNode(widgetclass, name, parent, layout, options, layoutOptions, id, index)
+            widget = self.createWidget(node)
+            #the widget is managed after its siblings, the order matters for pack and for the tabs
+            siblings = self.document.roots if parent == None else parent.children
+            if index + 1 < len(siblings):
+                following = widgetList[siblings[index + 1].id]
+                if layout == LAYOUT_PACK:
+                    widget.pack_configure(before=following)
+                elif layout == LAYOUT_TAB:
+                    widgetList[parent.id].insert(following, widget)
+            self.insertTreeRow(node, index)
         
     # -----------------------------------------------------------------------------------------------
     # Function that draws a frame around the selected widget
+    # The drawing is deferred until Tk is idle, so several changes in a row draw the frame only once
     # -----------------------------------------------------------------------------------------------   
     def highlight_widget(self,widget):
-        # We draw a frame around the selected widget
-        # We retrieve the coordinates of the widget
-        # To do this, we loop through each parent as long as master is not None, adding the coordinates
-        x = 0
-        y = 0
-        w = widget.winfo_width()
-        h = widget.winfo_height()
-        
-        while widget.master != None:
-            x += widget.winfo_x()
-            y += widget.winfo_y()
-            widget = widget.master
+        self.highlightedWidgets = [widget]
+        self.scheduler.markDirty("selection")
+
+    # -----------------------------------------------------------------------------------------------
+    # Surround the selected widgets with the selection frames
+    # -----------------------------------------------------------------------------------------------
+    def highlightSelection(self):
+        if not self.selectedWidgets:
+            self.hideSelection()
+            return
+        self.highlightedWidgets = list(self.selectedWidgets)
+        self.scheduler.markDirty("selection")
 
-        # We delete the old frames
+    # -----------------------------------------------------------------------------------------------
+    # Move the selection frames around the highlighted widgets
+    # -----------------------------------------------------------------------------------------------
+    def drawSelection(self):
+        if not self.highlightedWidgets:
+            return
+        # We retrieve the coordinates of the widgets relative to the main window
+        # they are kept until the geometry of a widget changes
+        left = top = None
+        for widget in self.highlightedWidgets:
+            geometry = self.geometryCache.get(str(widget))
+            if geometry == None:
+                geometry = (widget.winfo_rootx() - self.root.winfo_rootx(),
+                            widget.winfo_rooty() - self.root.winfo_rooty(),
+                            widget.winfo_width(),
+                            widget.winfo_height())
+                self.geometryCache[str(widget)] = geometry
+            x, y, w, h = geometry
+            if left == None:
+                left, top, right, bottom = x, y, x + w, y + h
+            else:
+                left, top, right, bottom = min(left, x), min(top, y), max(right, x + w), max(bottom, y + h)
+        #several widgets are surrounded by a single rectangle
+        self.drawRectangle(left, top, right - left, bottom - top)
+
+    # -----------------------------------------------------------------------------------------------
+    # Place the four selection frames on a rectangle of the main window
+    # -----------------------------------------------------------------------------------------------
+    def drawRectangle(self,x,y,w,h):
+        # The four frames are only moved
+        selectionT, selectionL, selectionR, selectionB = self.selectionFrameList
+        selectionT.place_configure(x=x, y=y, width=w, height=2)
+        selectionL.place_configure(x=x, y=y, width=2, height=max(h-2, 0))
+        selectionR.place_configure(x=x+w, y=y, width=2, height=max(h-2, 0))
+        selectionB.place_configure(x=x, y=y+h-2, width=w, height=2)
+
+    # -----------------------------------------------------------------------------------------------
+    # Hide the selection frames
+    # -----------------------------------------------------------------------------------------------
+    def hideSelection(self):
+        self.highlightedWidgets = []
         for frame in self.selectionFrameList:
-            frame.destroy()
-        self.selectionFrameList = []
-        # We draw the new frames
-    
-        selectionT = tk.Canvas(self.root,width=w, height=2, bg="red",borderwidth=0,highlightthickness=0)
-        selectionT.place(x=x,y=y) 
-        selectionT.tag_raise("all")
-        self.selectionFrameList.append(selectionT)
+            frame.place_forget()
+
+    # -----------------------------------------------------------------------------------------------
+    # Called when the geometry of the drawing frame or of a widget of the design changes
+    # The cached coordinates are no longer valid and the selection frame follows the widget
+    # -----------------------------------------------------------------------------------------------
+    def geometryChanged(self,event):
+        #only the drawing frame and the widgets of the design matter, not the panels of the editor
+        #nor the selection frames (children of the main window)
+        path = str(event.widget)
+        if path != str(self.frm_Dessin) and not path.startswith(str(self.frm_Dessin) + "."):
+            return
+        self.geometryCache.clear()
+        self.hitIndexStale = True
+        if self.highlightedWidgets:
+            self.scheduler.markDirty("selection")
 
-        selectionL = tk.Canvas(self.root,width=2, height=h-2, bg="red",borderwidth=0,highlightthickness=0)
-        selectionL.place(x=x,y=y) 
-        selectionL.tag_raise("all")
-        self.selectionFrameList.append(selectionL)
+    # -----------------------------------------------------------------------------------------------
+    # Function called by any left-click of the application (bind_all)
+    # The clicked widget of the design is found in the spatial index from the mouse position
+    # -----------------------------------------------------------------------------------------------
+    def clickDispatcher(self,event):
+        #only the clicks in the drawing frame select a widget
+        if not str(event.widget).startswith(str(self.frm_Dessin) + "."):
+            return
+        widget = self.widgetAt(event.x_root - self.frm_Dessin.winfo_rootx(), event.y_root - self.frm_Dessin.winfo_rooty())
+        #widgets outside of the drawing frame (Toplevel) are not in the index
+        if widget == None and str(event.widget) in widgetNodes:
+            widget = event.widget
+        if widget == None:
+            return
+        #Ctrl+click adds or removes the widget, Shift+click adds it
+        if event.state & 0x0004:
+            if widget in self.selectedWidgets:
+                self.setSelection([selected for selected in self.selectedWidgets if selected != widget])
+            else:
+                self.setSelection(self.selectedWidgets + [widget])
+        elif event.state & 0x0001:
+            if widget not in self.selectedWidgets:
+                self.setSelection(self.selectedWidgets + [widget])
+        else:
+            self.selectionWidget(widget)
 
-        selectionR = tk.Canvas(self.root,width=2, height=h-2, bg="red",borderwidth=0,highlightthickness=0)
-        selectionR.place(x=x+w,y=y)
-        selectionR.tag_raise("all")
-        self.selectionFrameList.append(selectionR)
+    # -----------------------------------------------------------------------------------------------
+    # Widget of the design at a position of the drawing frame, None if there is none
+    # -----------------------------------------------------------------------------------------------
+    def widgetAt(self,x,y):
+        if self.hitIndexStale:
+            self.rebuildHitIndex()
+        id = self.hitIndex.hit(x, y)
+        return widgetList.get(id) if id != None else None
 
-        selectionB = tk.Canvas(self.root,width=w, height=2, bg="red",borderwidth=0,highlightthickness=0)
-        selectionB.place(x=x,y=y+h-2) 
-        selectionB.tag_raise("all")
-        self.selectionFrameList.append(selectionB)
-        self.root.update()
+    # -----------------------------------------------------------------------------------------------
+    # Rebuild the spatial index from the geometry of the widgets
+    # The position of a widget is relative to its parent, the offsets are added while walking the document
+    # -----------------------------------------------------------------------------------------------
+    def rebuildHitIndex(self):
+        offsets = {}
+        rectangles = []
+        for node in self.document.walk():
+            if node.parent == None:
+                origin = (0, 0)
+            elif node.parent.id in offsets:
+                origin = offsets[node.parent.id]
+            else:
+                #the parent is hidden (tab not selected) or is not drawn in the frame
+                continue
+            if node.widgetClass in toplevelClasses:
+                continue
+            widget = widgetList[node.id]
+            if not widget.winfo_ismapped():
+                continue
+            size, x, y = widget.winfo_geometry().split("+")
+            width, height = size.split("x")
+            x = origin[0] + int(x)
+            y = origin[1] + int(y)
+            offsets[node.id] = (x, y)
+            rectangles.append((node.id, x, y, int(width), int(height)))
+        self.hitIndex.rebuild(rectangles)
+        self.hitIndexStale = False
 
     # -----------------------------------------------------------------------------------------------
     # Function called when a widget is selected via a left-click on the widget
     # It allows selecting the widget in the treeview on the left
     # -----------------------------------------------------------------------------------------------
-    def selectionWidget(self,event):
+    def selectionWidget(self,widget):
         # If the selected widget is the same as the previously selected widget, deselect it
-        if app.selectedWidget == event.widget:
-            app.selectedWidget = None
-            #Removing the selection frame    
-            for frame in app.selectionFrameList:
-                frame.destroy()
-            app.selectionFrameList = []
-            #Removing the selection in the treeview
-            app.tree.selection_remove(app.tree.selection())
-            self.displayOptions()
-            return
-        
-        app.selectedWidget = event.widget
-
-        #selecting the widget in the treeview
-        app.tree.selection_set(app.selectedWidget.winfo_id())
-        #Diplaying the frame around the selected widget
-        self.highlight_widget(self.selectedWidget)
+        if self.selectedWidgets == [widget]:
+            self.setSelection([])
+        else:
+            self.setSelection([widget])
 
+    # -----------------------------------------------------------------------------------------------
+    # Change the selected widgets, the last one is the selected widget used to add a child
+    # The treeview, the selection frames and the panels follow the selection
+    # -----------------------------------------------------------------------------------------------
+    @instrumented("select")
+    def setSelection(self,widgets):
+        self.selectedWidgets = list(widgets)
+        self.selectedWidget = self.selectedWidgets[-1] if self.selectedWidgets else None
+        ids = [widgetNodes[str(widget)].id for widget in self.selectedWidgets]
+        self.tree.selection_set(ids)
+        if ids:
+            self.tree.focus(ids[-1])
+            self.tree.see(ids[-1])
+        #Diplaying the frame around the selected widgets
+        self.highlightSelection()
         #we display the parameters in the right panel and the layout options in the left panel
         self.displayOptions()
-    
+
+    # -----------------------------------------------------------------------------------------------
+    # Rubber band selection in the drawing frame, Ctrl or Shift adds the widgets to the selection
+    # -----------------------------------------------------------------------------------------------
+    def startBand(self,event):
+        self.band = [event.x, event.y, event.x, event.y, bool(event.state & 0x0005)]
+        self.hideSelection()
+
+    def moveBand(self,event):
+        if self.band == None:
+            return
+        self.band[2] = event.x
+        self.band[3] = event.y
+        self.scheduler.markDirty("band")
+
+    def endBand(self,event):
+        if self.band == None:
+            return
+        x0, y0, x1, y1, additive = self.band
+        x1, y1 = event.x, event.y
+        self.band = None
+        #a click without moving selects nothing
+        widgets = []
+        if abs(x1 - x0) > 2 or abs(y1 - y0) > 2:
+            if self.hitIndexStale:
+                self.rebuildHitIndex()
+            widgets = [widgetList[id] for id in self.hitIndex.query(x0, y0, x1, y1)]
+        if additive:
+            widgets = self.selectedWidgets + [widget for widget in widgets if widget not in self.selectedWidgets]
+        self.setSelection(widgets)
+
+    def drawBand(self):
+        if self.band == None:
+            return
+        x0, y0, x1, y1, additive = self.band
+        #the band is drawn with the selection frames, placed in the main window
+        dx = self.frm_Dessin.winfo_rootx() - self.root.winfo_rootx()
+        dy = self.frm_Dessin.winfo_rooty() - self.root.winfo_rooty()
+        self.drawRectangle(min(x0, x1) + dx, min(y0, y1) + dy, abs(x1 - x0), abs(y1 - y0))
+
     # -----------------------------------------------------------------------------------------------
     # Color picker for the widget properties
     # -----------------------------------------------------------------------------------------------
     def chosecolor(self,event):
+        from tkinter import colorchooser
         color_code = colorchooser.askcolor(title="Chose color")
         print(color_code[1])
         event.widget.delete(0,tk.END)
@@ -543,403 +1070,444 @@ class MainWindow:
     # Display selected widgjet options
     # -----------------------------------------------------------------------------------------------
     def displayOptions(self):
-
-        #Clearing the parameters and layout options
-        #Parameters
-        for widget in self.frm_param.winfo_children():
-            widget.destroy()
-        self.paramEntryList.clear()
-        #Layout options
-        for widget in self.frm_layout_options.winfo_children():
-            widget.destroy()
-        self.layoutEntryList.clear()
+        staticrows = (self.lbl_other, self.lbl_name, self.entry_name, self.lbl_param, self.lbl_layout)
 
         #If no widget is selected we display only the top labels with the mention "No Widget selected"
         if self.selectedWidget == None:
-            label = tk.Label(self.frm_layout_options, text="Layout mode : No Widget selected",bg="#999")
-            label.place(x=0,y=0,relwidth=1)
-            label2 = tk.Label(self.frm_param, text="Parameters : No Widget selected" ,bg="#999")
-            label2.place(x=0,y=0,relwidth=1)
+            if self.optionsDisplayed:
+                for widget in staticrows:
+                    widget.grid_remove()
+                self.paramPanel.hide()
+                self.layoutPanel.hide()
+                self.lbl_no_layout.place(x=0,y=0,relwidth=1)
+                self.lbl_no_param.place(x=0,y=0,relwidth=1)
+                self.optionsDisplayed = False
             return
 
-        #Get the list of parameters
-        param = self.selectedWidget.keys().copy()
-        #we display the parameters in the right panel
-
-        #Before displaying we diplays the widget name with an entry widget to change it
-        #Grey big labl with the mention "Other option"
-        labelOther = tk.Label(self.frm_param, text="Other options",bg="#999")
-        labelOther.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
-        #we display the widget name with an entry widget to change it
-        labelName = tk.Label(self.frm_param, text="Name")
-        labelName.grid(row=1, column=0, sticky=tk.W)    
-        entryName = tk.Entry(self.frm_param)
-        entryName.insert(0, widgetnames[str(self.selectedWidget.winfo_id())])
-        entryName.grid(row=1, column=1, sticky=tk.W)
-        entryName.bind("<FocusOut>", self.changeName)
-        entryNameTooltip=CreateToolTip(entryName, text="Change the widget name \n this will be used to have better variables names in the code")
-
-        #Grey big labl with the mention "Parameters"
-        label2 = tk.Label(self.frm_param, text="Parameters : " + str(self.selectedWidget.winfo_id())  ,bg="#999")
-        label2.grid(row=2, column=0,columnspan=2,sticky=(tk.W,tk.E))
-        i = 3
-        for key in param:
-            #we dont display all the parameter 
-            if key in hidenProperties:
-                continue
-            #we display the parameter name
-            label = tk.Label(self.frm_param, text=key)
-            label.grid(row=i, column=0, sticky=tk.W)
-            #If the parameter is in the list of predefined values we display a combobox
-            if key in listProperties:
-                entry = ttk.Combobox(self.frm_param, values=listProperties[key],width=17)
-                entry.insert(0, self.selectedWidget.cget(key))
-                entry.grid(row=i, column=1, sticky=tk.W)
-                #we save the entry widget in a list
-                self.paramEntryList[entry.winfo_id()] = key
-                #we bind the entry widget to the change event
-                entry.bind("<<ComboboxSelected>>", self.changeParam)    
-            else:
-                #we display the parameter value
-                entry = tk.Entry(self.frm_param)
-                entry.insert(0, self.selectedWidget.cget(key))
-                entry.grid(row=i, column=1, sticky=tk.W)
-                #we save the entry widget in a list
-                self.paramEntryList[entry.winfo_id()] = key
-                #we bind the entry widget to the change event
-                entry.bind("<FocusOut>", self.changeParam)
-            if  key in colorProperties:
-                entry.bind("<Double-Button-1>", self.chosecolor)
-                tooltip=CreateToolTip(entry, text="Double click to chose a color")
-
-            i += 1
-
-
-        #get the list of layout options
-        layoutmetod = self.getPackingMetod(self.selectedWidget)
-        param={}
-        #we display the layout options in the left panel
-        if self.selectedWidget.master.winfo_class() == "TNotebook":
-            param={}
-            label = tk.Label(self.frm_layout_options, text="Layout mode : NA the widget is in a Notebook",bg="#999")
-            label.grid(row=0, column=0,columnspan=2,sticky=(tk.W))
+        if not self.optionsDisplayed:
+            self.lbl_no_layout.place_forget()
+            self.lbl_no_param.place_forget()
+            for widget in staticrows:
+                widget.grid()
+            self.optionsDisplayed = True
+
+        #the values are read from the document: the defaults of the class and the changed options
+        nodes = [widgetNodes[str(widget)] for widget in self.selectedWidgets]
+        node = widgetNodes[str(self.selectedWidget)]
+        if len(nodes) == 1:
+            self.selectedName.set(node.name)
+            self.entry_name.configure(state="normal")
+            self.lbl_param.configure(text="Parameters : " + str(node.id))
         else:
-            if layoutmetod==1:
-                param=self.selectedWidget.place_info().copy()
-                label = tk.Label(self.frm_layout_options, text="Layout mode : PLACE",anchor="center",bg="#999")
-                label.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
-            if layoutmetod==2:
-                param=self.selectedWidget.grid_info().copy()
-                label = tk.Label(self.frm_layout_options, text="Layout mode : GRID",anchor="center",bg="#999")
-                label.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
-            if layoutmetod==3:
-                param=self.selectedWidget.pack_info().copy()
-                label = tk.Label(self.frm_layout_options, text="Layout mode : PACK",anchor="center",bg="#999")
-                label.grid(row=0, column=0,columnspan=2,sticky=(tk.W,tk.E))
+            #the name can not be changed for several widgets
+            self.selectedName.set(str(len(nodes)) + " widgets selected")
+            self.entry_name.configure(state="disabled")
+            self.lbl_param.configure(text="Parameters : " + ", ".join(sorted({node.widgetClass for node in nodes})))
+        #we dont display all the parameter 
+        param = self.sharedOptions(nodes, False)
+        self.displayedOptions = dict(param)
+        self.paramPanel.show(tuple(sorted({node.widgetClass for node in nodes})), param)
 
-        
-        i = 1
-        for key in param:
-            if key in hidenLayoutOptions:
-                continue
+        #we display the layout options in the left panel
+        layouts = {node.layout for node in nodes}
+        if LAYOUT_TAB in layouts:
+            self.lbl_layout.configure(text="Layout mode : NA the widget is in a Notebook")
+            self.layoutPanel.hide()
+            return
+        if len(layouts) > 1:
+            self.lbl_layout.configure(text="Layout mode : the widgets use different layout methods")
+            self.layoutPanel.hide()
+            return
+        self.lbl_layout.configure(text="Layout mode : " + ["PLACE", "GRID", "PACK"][node.layout - 1])
+        param = self.sharedOptions(nodes, True)
+        self.displayedLayoutOptions = dict(param)
+        self.layoutPanel.show(node.layout, param)
 
-            if key in layoutOptions:
-                #we display the parameter name
-                label = tk.Label(self.frm_layout_options, text=key,width=20,anchor="w")
-                label.grid(row=i, column=0, sticky=tk.W)
-                #If the parameter is in the list of predefined values we display a combobox
-                entry = ttk.Combobox(self.frm_layout_options, values=layoutOptions[key],width=22)
-                entry.insert(0, param[key])
-                entry.grid(row=i, column=1, sticky=tk.W)
-                #we save the entry widget in a list
-                self.layoutEntryList[entry.winfo_id()] = key
-                #we bind the entry widget to the change event
-                entry.bind("<<ComboboxSelected>>", self.changeLayoutParam)    
-                i += 1
-                continue
+    # -----------------------------------------------------------------------------------------------
+    # Options displayed for the selected nodes, as (key, value)
+    # With several nodes only the options of all their classes are displayed, and the value is
+    # empty when the nodes have different values
+    # -----------------------------------------------------------------------------------------------
+    def sharedOptions(self,nodes,layout):
+        items = None
+        for node in nodes:
+            defaults = self.getClassDefaults(node.widgetClass)
+            if layout:
+                defaults, overrides, hidden = defaults[node.layout], node.layoutOptions, hidenLayoutOptions
             else:
-                #we display the parameter name
-                label = tk.Label(self.frm_layout_options, text=key,width=20,anchor="w")
-                label.grid(row=i, column=0, sticky=tk.W)
-                #If the parameter is in the list of predefined values we display a combobox
-                entry = tk.Entry(self.frm_layout_options,width=25)
-                entry.insert(0, param[key])
-                entry.grid(row=i, column=1, sticky=tk.W)
-                #we save the entry widget in a list
-                self.layoutEntryList[entry.winfo_id()] = key
-                #we bind the entry widget to the change event
-                entry.bind("<FocusOut>", self.changeLayoutParam)
-                i += 1
-            #we display the parameter name
-            #label = tk.Label(self.frm_layout_options, text=key,width=20,anchor="w")
-            #label.grid(row=i, column=0, sticky=tk.W)
-            #we display the parameter value
-            #entry = tk.Entry(self.frm_layout_options,width=25)
-            #if layoutmetod==1:
-            #    entry.insert(0, self.selectedWidget.place_info().get(key))
-            #if layoutmetod==2:
-            #    entry.insert(0, self.selectedWidget.grid_info().get(key))
-            #if layoutmetod==3:
-            #    entry.insert(0, self.selectedWidget.pack_info().get(key))
-            #entry.grid(row=i, column=1, sticky=tk.W)
-            #we save the entry widget in a list
-            #self.layoutEntryList[entry.winfo_id()] = key
-            #we bind the entry widget to the change event
-            #entry.bind("<FocusOut>", self.changeLayoutParam)
-            #i += 1
+                defaults, overrides, hidden = defaults["options"], node.options, hidenProperties
+            values = {key: overrides.get(key, default) for key, default in defaults.items() if key not in hidden}
+            if items == None:
+                items = values
+            else:
+                items = {key: value if values[key] == value else "" for key, value in items.items() if key in values}
+        return list(items.items())
 
     # -----------------------------------------------------------------------------------------------
     # Function called when a parameter is changed
     # -----------------------------------------------------------------------------------------------
+    @instrumented("edit")
     def changeParam(self,event):
+        #the rows are kept between selections, a hidden row can still lose the focus
+        if not self.paramPanel.displays(event.widget):
+            return
         #we get the parameter name
-        param = self.paramEntryList[event.widget.winfo_id()]
+        param = self.paramEntryList[str(event.widget)]
     
         #we get the parameter value
         value = event.widget.get()
-        #we set the parameter value
-        self.selectedWidget.config({param: value})
-        self.selectedWidget.update()
-        self.highlight_widget(self.selectedWidget)
+        if value == self.displayedOptions.get(param):
+            return
+        self.displayedOptions[param] = value
+        #the value is set to all the selected widgets, with a single refresh and a single undo
+        changes = []
+        try:
+            with self.scheduler.batch():
+                for widget in self.selectedWidgets:
+                    #we set the parameter value
+                    widget.config({param: value})
+                    #the node is synced from one read of all the options, an option can change other ones
+                    changes.extend(self.syncOptions(widgetNodes[str(widget)], OptionSnapshot(widget)))
+                self.highlightSelection()
+        finally:
+            self.recordChanges(changes)
+
+    # -----------------------------------------------------------------------------------------------
+    # Keep in the document the options of a snapshot that differ from the defaults of the class
+    # Returns the changes of the node for the history
+    # -----------------------------------------------------------------------------------------------
+    def syncOptions(self,node:WidgetNode,snapshot:OptionSnapshot):
+        overrides = snapshot.changed(self.getClassDefaults(node.widgetClass)["options"])
+        changes = []
+        for key in sorted(set(overrides) | set(node.options)):
+            if overrides.get(key) != node.options.get(key):
+                changes.append(("option", node.id, key, node.options.get(key), overrides.get(key)))
+                self.document.setOption(node, key, overrides.get(key))
+        return changes
+
+    # -----------------------------------------------------------------------------------------------
+    # Add the changes of an edit to the history, the changes of several widgets are undone together
+    # -----------------------------------------------------------------------------------------------
+    def recordChanges(self,changes):
+        if len(changes) == 1:
+            self.history.record(changes[0])
+        elif len(changes) > 1:
+            self.history.record(("batch", tuple(changes)))
 
     # -----------------------------------------------------------------------------------------------
     # Function called when the widget name is changed
     # -----------------------------------------------------------------------------------------------
+    @instrumented("edit")
     def changeName(self,event):
+        #nothing to do if the name is not changed
+        if len(self.selectedWidgets) != 1:
+            return
+        node = widgetNodes[str(self.selectedWidget)]
+        if event.widget.get() == node.name:
+            return
         #check if the name is unique
-        if  event.widget.get() in widgetnames.values():
-            tk.messagebox.showinfo("Error", "The widget name must be unique")
+        if  self.document.hasName(event.widget.get()):
+            self.showError("The widget name must be unique")
             #we set the parameter value to the old value
             event.widget.delete(0,tk.END)
-            event.widget.insert(0, widgetnames[str(self.selectedWidget.winfo_id())])
+            event.widget.insert(0, node.name)
             return None
 
         #we get the parameter value
         value = event.widget.get()
         #we set the parameter value
-        widgetnames[str(self.selectedWidget.winfo_id())]=value
-        self.tree.item(self.selectedWidget.winfo_id(), text=value)
-        self.selectedWidget.update()
-        self.highlight_widget(self.selectedWidget)
+        self.history.record(("name", node.id, node.name, value))
+        self.setNodeName(node, value)
+        self.highlightSelection()
 
 
     # -----------------------------------------------------------------------------------------------
     # Function called when a layout option is changed
     # -----------------------------------------------------------------------------------------------
+    @instrumented("edit")
     def changeLayoutParam(self,event):
+        #the rows are kept between selections, a hidden row can still lose the focus
+        if not self.layoutPanel.displays(event.widget):
+            return
         #we get the parameter name
-        parameter = self.layoutEntryList[event.widget.winfo_id()]
+        parameter = self.layoutEntryList[str(event.widget)]
         #we get the parameter value
         value = event.widget.get()
-        #we set the parameter value
-        layoutmode=self.getPackingMetod(self.selectedWidget)
-        if layoutmode == 1:
-            self.selectedWidget.place_configure({parameter: value})
-        if layoutmode == 2:
-            self.selectedWidget.grid_configure({parameter: value})
-        if layoutmode == 3:
-            self.selectedWidget.pack_configure({parameter: value})
-        
-        #self.selectedWidget.config({param: value})
-        self.selectedWidget.update()
-        self.highlight_widget(self.selectedWidget)
+        if value == self.displayedLayoutOptions.get(parameter):
+            return
+        self.displayedLayoutOptions[parameter] = value
+        #the selected widgets use the same layout method, they are changed together
+        changes = []
+        try:
+            with self.scheduler.batch():
+                for widget in self.selectedWidgets:
+                    node = widgetNodes[str(widget)]
+                    layoutmode = node.layout
+                    #we set the parameter value
+                    if layoutmode == 1:
+                        widget.place_configure({parameter: value})
+                    if layoutmode == 2:
+                        widget.grid_configure({parameter: value})
+                    if layoutmode == 3:
+                        widget.pack_configure({parameter: value})
+                    #the document keeps the layout options that differ from the defaults
+                    old = node.layoutOptions.get(parameter)
+                    self.document.setLayout(node, layoutmode, self.getLayoutOptions(widget, layoutmode, node.widgetClass))
+                    if node.layoutOptions.get(parameter) != old:
+                        changes.append(("layout", node.id, parameter, old, node.layoutOptions.get(parameter)))
+                self.highlightSelection()
+        finally:
+            self.recordChanges(changes)
     
+    # -----------------------------------------------------------------------------------------------
+    # Undo and redo (Edit menu, Ctrl+Z and Ctrl+Y)
+    # -----------------------------------------------------------------------------------------------
+    @instrumented("undo")
+    def undo(self,event=None):
+        self.commitEdits()
+        change = self.history.undo()
+        if change != None:
+            self.applyChange(change, True)
+
+    @instrumented("undo")
+    def redo(self,event=None):
+        self.commitEdits()
+        change = self.history.redo()
+        if change != None:
+            self.applyChange(change, False)
+
+    # -----------------------------------------------------------------------------------------------
+    # Apply the value being typed in the panels, so it is in the history before an undo
+    # -----------------------------------------------------------------------------------------------
+    def commitEdits(self):
+        self.paramPanel.commitFocus()
+        self.layoutPanel.commitFocus()
+        self.changeName(SimpleNamespace(widget=self.entry_name))
+
+    # -----------------------------------------------------------------------------------------------
+    # Apply a change of the history (see tkmakerHistory), backwards for undo
+    # The widgets changed are selected
+    # -----------------------------------------------------------------------------------------------
+    def applyChange(self,change,undo):
+        changes = change[1] if change[0] == "batch" else (change,)
+        if undo:
+            changes = reversed(changes)
+        selection = []
+        with self.scheduler.batch():
+            for change in changes:
+                kind = change[0]
+                if kind in ("add", "remove"):
+                    if (kind == "add") == undo:
+                        self.deleteNodes(change[1])
+                    else:
+                        self.restoreNodes(change[1])
+                    continue
+                node = self.document.nodes[change[1]]
+                value = change[-2] if undo else change[-1]
+                if kind == "option":
+                    self.setNodeOption(node, change[2], value)
+                elif kind == "layout":
+                    self.setNodeLayoutOption(node, change[2], value)
+                else:
+                    self.setNodeName(node, value)
+                selection.append(widgetList[node.id])
+            if selection:
+                self.setSelection(selection)
+            else:
+                self.displayOptions()
+
+    # -----------------------------------------------------------------------------------------------
+    # Set an option of a widget and of its node, None sets the default value
+    # -----------------------------------------------------------------------------------------------
+    def setNodeOption(self,node:WidgetNode,key,value):
+        default = self.getClassDefaults(node.widgetClass)["options"].get(key)
+        widgetList[node.id].config({key: default if value == None else value})
+        self.document.setOption(node, key, value)
+
+    def setNodeLayoutOption(self,node:WidgetNode,key,value):
+        widget = widgetList[node.id]
+        default = self.getClassDefaults(node.widgetClass)[node.layout].get(key)
+        if node.layout == LAYOUT_PLACE:
+            widget.place_configure({key: default if value == None else value})
+        elif node.layout == LAYOUT_GRID:
+            widget.grid_configure({key: default if value == None else value})
+        elif node.layout == LAYOUT_PACK:
+            widget.pack_configure({key: default if value == None else value})
+        layoutOptions = dict(node.layoutOptions)
+        if value == None:
+            layoutOptions.pop(key, None)
+        else:
+            layoutOptions[key] = value
+        self.document.setLayout(node, node.layout, layoutOptions)
+
+    def setNodeName(self,node:WidgetNode,name):
+        self.document.rename(node, name)
+        self.tree.item(node.id, text=name)
+
     # ----------------------------------------------------------------------------------------------- 
-    #Function called when selecting a widget in the treeview
+    #Function called when clicking in the treeview
+    #A click on the only selected widget deselects it, the other clicks (and Ctrl/Shift) are
+    #handled by the treeview and followed by treeSelectionChanged
     # -----------------------------------------------------------------------------------------------
     def selectionTree(self,event):
         #On recupere le widget selectionné
         widgetid = self.tree.identify('item', event.x, event.y)
-        selection = None
-        selection = widgetList[widgetid]
+        if widgetid == "" or event.state & 0x0005:
+            return
+        selection = widgetList[int(widgetid)]
    
         #Si le widget selectionné est le meme que le widget selectionné précédemment on le deselectionne
-        if self.selectedWidget == selection:
-            self.selectedWidget = None
-            #On supprime les cadres de selection    
-            for frame in self.selectionFrameList:
-                frame.destroy()
-            self.selectionFrameList = []
-            #On deselectionne le widget dans le treeview
-            self.tree.selection_remove(self.tree.selection())
-            self.displayOptions()
-            return
-            
-        self.selectedWidget = selection
+        if self.selectedWidgets == [selection]:
+            self.setSelection([])
+            return "break"
 
-        #On affiche le cadre autour du widget
-        if self.selectedWidget != None:
-            if self.selectedWidget.keys().__contains__("width"):
-                self.highlight_widget(self.selectedWidget)
-        
-        #for the selected widget we display the parameters in the right panel
-        #we remove all the widgets from the right panel 
-        for widget in self.frm_param.winfo_children():
-            widget.destroy()
-        #we display the parameters in the right panel
-        self.displayOptions()
+    # ----------------------------------------------------------------------------------------------- 
+    #Function called when the selection of the treeview changes
+    # -----------------------------------------------------------------------------------------------
+    def treeSelectionChanged(self,event):
+        ids = [int(widgetid) for widgetid in self.tree.selection()]
+        if set(ids) == {widgetNodes[str(widget)].id for widget in self.selectedWidgets}:
+            return
+        #the item clicked last is the selected widget
+        focus = self.tree.focus()
+        if focus != "" and int(focus) in ids:
+            ids.remove(int(focus))
+            ids.append(int(focus))
+        self.setSelection([widgetList[id] for id in ids])
 
 
     # ----------------------------------------------------------------------------------------------- 
     # Generate code for EXPORT or BACKUP
     # -----------------------------------------------------------------------------------------------
+    @instrumented("export")
     def generateCode(self, mode="EXPORT"):
         pickedfiletypes = [("Python file","*.py")]
 
-        result = ""
-        result += "import tkinter as tk\n"
-        result += "from tkinter import ttk\n"
-        result += "from tkinter import messagebox\n"
-        result += "from tkinter import colorchooser\n"
-        result += "\n"
-        if mode == "BACKUP":
-            result += "class Backup:\n"
-        else:
-            result += "class MainWindow:\n"
-         
-        
-        result += "    def __init__(self, root):\n"
-        result += "        self.root = root\n"
-        if mode != "BACKUP":
-            result += "        self.root.title(\"Tkinter Editor\")\n"
-            result += "        self.root.geometry(\"800x600\")\n"
-        else:
-            result += "        self.widgetnames = {}\n"
-        #wid=tk.Widget()
-        #wid.master self.frm_Dessin
-        for wid in widgetList.values():
-
-            #Widget creation function
-            if wid.master == self.frm_Dessin:
-                parent ="self.root"
-            else:
-                parent = "self." + widgetnames[str(wid.master.winfo_id())]
-            
-            if wid.winfo_class() in ttkWidgets:
-                result += "        self." + widgetnames[str(wid.winfo_id())] + " = ttk." + wid.winfo_class() + "(" + parent + ")\n"
-                func = getattr(ttk, wid.winfo_class()) # type: ignore
-            else:
-                result += "        self." + widgetnames[str(wid.winfo_id())] + " = tk." + wid.winfo_class() + "(" + parent + ")\n"
-                func = getattr(tk, wid.winfo_class()) # type: ignore
-
-            #if we are in backup mode we add the widget name to the widgetnames list
-            if mode == "BACKUP":
-                result += "        self.widgetnames[str(self." + widgetnames[str(wid.winfo_id())]+".winfo_id())] = \"" + widgetnames[str(wid.winfo_id())] + "\"\n"
-           
-
-            #Parameters
-            tmpfrm = tk.Frame(self.root)
-            defwid = func(tmpfrm)
-            defaultparams = defwid.keys().copy()
-            for key in defaultparams:
-                if defwid.cget(key) != wid.cget(key):
-                         result += "        self." + widgetnames[str(wid.winfo_id())] + ".config({\""+key+"\":'" + str(wid.cget(key)) + "'})\n"
-            
-
-            #Layout parameters
-            layoutTyp = self.getPackingMetod(wid)
-            if layoutTyp == 1:
-                defwid.place(x=0,y=0)
-                defaultlayout = defwid.place_info().copy()
-                result += "        self." + widgetnames[str(wid.winfo_id())] + ".place(x=0,y=0)\n" 
-            elif layoutTyp == 2:
-                defwid.grid(row=0, column=0)
-                defaultlayout = defwid.grid_info().copy()
-                result += "        self." + widgetnames[str(wid.winfo_id())]  + ".grid(row=0, column=0)\n" 
-            else:
-                defwid.pack()
-                defaultlayout = defwid.pack_info().copy()
-                result += "        self." + widgetnames[str(wid.winfo_id())] + ".pack()\n" 
-            for key in defaultlayout:
-                if key!="in":
-                    if layoutTyp==1:
-                        if defwid.place_info().get(key) != wid.place_info().get(key):
-                            result += "        self." + widgetnames[str(wid.winfo_id())] + ".place_configure({\""+key+"\":'" + str(wid.place_info().get(key)) + "'})\n"
-                    if layoutTyp==2:
-                        if defwid.grid_info().get(key) != wid.grid_info().get(key):
-                            result += "        self." + widgetnames[str(wid.winfo_id())] + ".grid_configure({\""+key+"\":'" + str(wid.grid_info().get(key)) + "'})\n"
-                    if layoutTyp==3:
-                        if defwid.pack_info().get(key) != wid.pack_info().get(key):
-                            result += "        self." + widgetnames[str(wid.winfo_id())] + ".pack_configure({\""+key+"\":'" + str(wid.pack_info().get(key)) + "'})\n"
-                    
-            defwid.destroy()
-            tmpfrm.destroy()
-
-            
-
-        result += "\n"
-        if mode != "BACKUP":
-            result += "if __name__ == \"__main__\":\n"
-            result += "    root = tk.Tk()\n"
-            result += "    app = MainWindow(root)\n"
-            result += "    root.mainloop()\n"
-
-        f = asksaveasfile( initialdir= os.getcwd(),
+        from tkinter.filedialog import asksaveasfilename
+        path = asksaveasfilename( initialdir= os.getcwd(),
                                     title= "Enter à file:",
                                     filetypes = pickedfiletypes)
-        if f:
-            f.write(result)
+        if not path:
+            return
+        #the code is generated from the document, without reading the widgets, and written as it is generated
+        try:
+            tkmakerCodegen.writeCode(self.document, path, mode, self.lazyTabs.get())
+        except OSError as error:
+            self.showError("Unable to export %s: %s" % (path, error))
+
+    # ----------------------------------------------------------------------------------------------- 
+    # Display the code that would be exported
+    # -----------------------------------------------------------------------------------------------
+    def previewCode(self):
+        from tkmakerPreview import CodePreview
+        #the document is read at each refresh, it is replaced when a file is opened
+        CodePreview(self.root, lambda: self.document, self.lazyTabs.get)
 
     # ----------------------------------------------------------------------------------------------- 
     # Get Default parameter collection used to comapare with the widget parameters during the export
     # -----------------------------------------------------------------------------------------------
     def getDefaultParameters(self,widget:tk.Widget):
-        result = ""
+        return list(self.getClassDefaults(widgetNodes[str(widget)].widgetClass)["options"].keys())
+
+    # ----------------------------------------------------------------------------------------------- 
+    # Get the default options and layout options of a widget class (WidgetType value)
+    # A default widget is built only the first time a class is asked, the result is kept for the session
+    # -----------------------------------------------------------------------------------------------
+    def getClassDefaults(self,widgetclass):
+        if widgetclass in classDefaults:
+            return classDefaults[widgetclass]
+
         #getting the function to create the widget
         try:
-            func = getattr(tk, widget.winfo_class()) # type: ignore
+            func = getattr(tk, widgetclass) # type: ignore
         except:
-            func = getattr(ttk, widget.winfo_class()) # type: ignore
-        defwid = func(self.root)
-        params = defwid.keys().copy()
+            func = getattr(ttk, widgetclass) # type: ignore
+        tmpfrm = tk.Frame(self.root)
+        defwid = func(tmpfrm)
+
+        #all the options are read in a single call
+        defaults = {"options": OptionSnapshot(defwid).values, 1: {}, 2: {}, 3: {}}
+
+        #default layout options for each layout method (place=1, grid=2, pack=3)
+        #some widgets (Toplevel, Menu) can not be managed, they keep an empty collection
+        try:
+            defwid.place(x=0,y=0)
+            defaults[1] = {key: str(value) for key, value in defwid.place_info().items() if key != "in"}
+            defwid.place_forget()
+            defwid.grid(row=0, column=0)
+            defaults[2] = {key: str(value) for key, value in defwid.grid_info().items() if key != "in"}
+            defwid.grid_forget()
+            defwid.pack()
+            defaults[3] = {key: str(value) for key, value in defwid.pack_info().items() if key != "in"}
+        except tk.TclError:
+            pass
+
         defwid.destroy()
-        return params
-    
-    # -----------------------------------------------------------------------------------------------
-    # Load the widget list (used during the loading of a project)
-    # -----------------------------------------------------------------------------------------------
-    def loadWidgetList(self,widgetparent:tk.Widget=None):
-        if widgetparent == None:
-            for widget in self.frm_Dessin.winfo_children():
-                widgetList[str(widget.winfo_id())]=widget
-                widget.bind("<Button-1>", self.selectionWidget)
-                self.loadWidgetList(widget)
-        else:
-            for widget in widgetparent.winfo_children():
-                widgetList[str(widget.winfo_id())]=widget
-                widget.bind("<Button-1>", self.selectionWidget)
-                self.loadWidgetList(widget)
+        tmpfrm.destroy()
+        classDefaults[widgetclass] = defaults
+        return defaults
 
+    # ----------------------------------------------------------------------------------------------- 
+    # Get the layout options of a widget that differ from the defaults of its layout method
     # -----------------------------------------------------------------------------------------------
-    # Load the widget names (used during the loading of a project)
-    # -----------------------------------------------------------------------------------------------
-    def loadWidgetNames(self):
-        i=0
-        list2 = widgetnames.copy()
-        names=[]
-        for val in widgetnames.values():
-            names.append(val)
+    def getLayoutOptions(self,widget:tk.Widget,layoutmode,widgetclass):
+        if layoutmode == LAYOUT_PLACE:
+            layoutinfo = widget.place_info()
+        elif layoutmode == LAYOUT_GRID:
+            layoutinfo = widget.grid_info()
+        elif layoutmode == LAYOUT_PACK:
+            layoutinfo = widget.pack_info()
+        else:
+            return {}
+        result = {}
+        for key, default in self.getClassDefaults(widgetclass)[layoutmode].items():
+            value = str(layoutinfo.get(key))
+            if value != default:
+                result[key] = value
+        return result
 
-       
 
-        widgetnames.clear()
-        for widget in widgetList.values():
-            widgetnames[str(widget.winfo_id())]=names[i]
-            i+=1
-        
-    # -----------------------------------------------------------------------------------------------
-    # Load the treeview (used during the loading of a project)
-    # -----------------------------------------------------------------------------------------------
-    def loadTreeView(self):
-        for widget in widgetList.values():
-            if widget.master == self.frm_Dessin:
-                self.tree.insert("", "end", text=widgetnames[str(widget.winfo_id())],iid=widget.winfo_id(), image=self.appicons["price-tag-3-fill"])
-            else:
-                self.tree.insert(widget.master.winfo_id(), "end", text=widgetnames[str(widget.winfo_id())],iid=widget.winfo_id(), image=self.appicons["price-tag-3-fill"])
 
+# -----------------------------------------------------------------------------------------------
+# Print the duration of each step of the startup (--profile-startup)
+# -----------------------------------------------------------------------------------------------
+def startupReport(steps):
+    previous = startTime
+    for step, instant in steps:
+        print("startup: %-12s %8.1f ms" % (step, (instant - previous) * 1000), file=sys.stderr)
+        previous = instant
+    print("startup: %-12s %8.1f ms" % ("total", (previous - startTime) * 1000), file=sys.stderr)
 
 
 if __name__ == "__main__":
+    #--profile-startup prints the time to the first frame of the editor
+    profile = "--profile-startup" in sys.argv[1:]
+    #--instrument[=file] counts the calls to Tcl (see tkmakerInstrument)
+    instrument = os.environ.get("TKMAKER_INSTRUMENT")
+    for arg in sys.argv[1:]:
+        if arg == "--instrument":
+            instrument = instrument or "1"
+        elif arg.startswith("--instrument="):
+            instrument = arg.split("=", 1)[1]
+    argv = [arg for arg in sys.argv[1:] if arg != "--profile-startup" and arg.split("=")[0] != "--instrument"]
+    #command line tools: python -m tkmaker export in/*.py -o out/
+    if len(argv) > 0:
+        import tkmakerCli
+        sys.exit(tkmakerCli.main(argv))
+
+    steps = [("imports", time.perf_counter())]
     root = tk.Tk()
+    if instrument:
+        #the interpreter is replaced before the widgets are created
+        tkmakerInstrument.enable(root, None if instrument == "1" else instrument)
+    steps.append(("tk", time.perf_counter()))
     app = MainWindow(root)
-    root.mainloop()
\ No newline at end of file
+    steps.append(("main window", time.perf_counter()))
+    if profile:
+        #the window is mapped and drawn once before the report
+        root.update()
+        steps.append(("first frame", time.perf_counter()))
+        startupReport(steps)
+    root.mainloop()
+    if tkmakerInstrument.current != None and tkmakerInstrument.current.dumpPath:
+        tkmakerInstrument.current.dump(tkmakerInstrument.current.dumpPath)
\ No newline at end of file
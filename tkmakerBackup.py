@@ -0,0 +1,205 @@
+# Description: Loading of the Backup .py files written by generateCode(mode="BACKUP")
+# The file is parsed with ast and never imported: only the statements written by TkMaker are read
+# (widget creation, config, place/grid/pack, *_configure and Notebook add), and in the exported
+# files the options shared through the option database or a dict
+
+import ast
+import os
+
+from tkmakerConfig import ttkWidgets, optionDatabaseNames
+from tkmakerModel import Document, LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK, LAYOUT_TAB
+from tkmakerProject import widgetClasses, checkNode
+
+# Layout method of each layout call
+layoutCalls = {"place": LAYOUT_PLACE, "place_configure": LAYOUT_PLACE,
+               "grid": LAYOUT_GRID, "grid_configure": LAYOUT_GRID,
+               "pack": LAYOUT_PACK, "pack_configure": LAYOUT_PACK}
+
+# Options written by the generator to create the layout, they are the defaults of the editor
+layoutBaseOptions = {LAYOUT_PLACE: {"x": "0", "y": "0"},
+                     LAYOUT_GRID: {"row": "0", "column": "0"},
+                     LAYOUT_PACK: {}}
+
+# Option of each database name, the full name rather than the alias (background, not bg)
+databaseOptions = {}
+for option, databaseName in optionDatabaseNames.items():
+    if len(option) > len(databaseOptions.get(databaseName, "")):
+        databaseOptions[databaseName] = option
+
+backupCache = {} #Parsed backups by path: ((mtime, size), records)
+
+
+# -----------------------------------------------------------------------------------------------
+# Name of the attribute when the expression is self.<name>, None otherwise
+# -----------------------------------------------------------------------------------------------
+def selfAttribute(expression):
+    if isinstance(expression, ast.Attribute) and isinstance(expression.value, ast.Name) and expression.value.id == "self":
+        return expression.attr
+    return None
+
+# -----------------------------------------------------------------------------------------------
+# Options given to a call, as a positional dict ({"key": value}) and/or as keywords
+# A positional or ** argument can also be the name of a dict of variables
+# -----------------------------------------------------------------------------------------------
+def callOptions(call, skip=0, variables={}):
+    options = {}
+    try:
+        for argument in call.args[skip:]:
+            if isinstance(argument, ast.Name) and argument.id in variables:
+                value = variables[argument.id]
+            else:
+                value = ast.literal_eval(argument)
+            if not isinstance(value, dict):
+                raise ValueError
+            options.update(value)
+        for keyword in call.keywords:
+            if keyword.arg is None and isinstance(keyword.value, ast.Name) and keyword.value.id in variables:
+                options.update(variables[keyword.value.id])
+            elif keyword.arg is None:
+                value = ast.literal_eval(keyword.value)
+                if not isinstance(value, dict):
+                    raise ValueError
+                options.update(value)
+            else:
+                #tkinter removes the trailing _ of the keywords (class_=)
+                options[keyword.arg.rstrip("_")] = ast.literal_eval(keyword.value)
+    except ValueError:
+        raise ValueError("Unsupported statement at line %d" % call.lineno)
+    return {str(key): str(value) for key, value in options.items()}
+
+# -----------------------------------------------------------------------------------------------
+# Parse the source of a backup
+# Returns the widgets as records [widgetClass, name, parentName, layout, options, layoutOptions]
+# in creation order. Raises ValueError if the source is not a TkMaker backup
+# -----------------------------------------------------------------------------------------------
+def parseBackup(source, filename="<backup>"):
+    try:
+        module = ast.parse(source, filename)
+    except SyntaxError as error:
+        raise ValueError("Invalid backup file: %s" % error)
+
+    #the global dicts of shared options, then __init__, then the other methods (builders of the
+    #Notebook tabs), they create the widgets in this order
+    statements = [statement for statement in module.body if isinstance(statement, ast.Assign) and isinstance(statement.value, ast.Dict)]
+    init = None
+    for statement in module.body:
+        if isinstance(statement, ast.ClassDef) and statement.name in ("Backup", "MainWindow"):
+            methods = []
+            for item in statement.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                    init = item
+                elif isinstance(item, ast.FunctionDef):
+                    methods.extend(item.body)
+            break
+    if init == None:
+        raise ValueError("No Backup class found in %s" % filename)
+    statements += init.body + methods
+    #the widgets of a TCL export are created by a script, they can not be read back
+    for statement in module.body:
+        if isinstance(statement, ast.Assign) and isinstance(statement.targets[0], ast.Name) and statement.targets[0].id == "TCL_SCRIPT":
+            raise ValueError("%s is a Tcl export, it can not be opened" % filename)
+
+    records = {}
+    variables = {} #dicts of options shared by several widgets: name = {...}
+    database = {} #options of the database by class: self.root.option_add("*Class.name", value)
+    for statement in statements:
+        if isinstance(statement, ast.Assign) and isinstance(statement.targets[0], ast.Name) and isinstance(statement.value, ast.Dict):
+            try:
+                variables[statement.targets[0].id] = ast.literal_eval(statement.value)
+            except ValueError:
+                raise ValueError("Unsupported statement at line %d" % statement.lineno)
+            continue
+        #widget creation: self.name = tk.Class(self.parent, ...)
+        if isinstance(statement, ast.Assign) and isinstance(statement.value, ast.Call):
+            name = selfAttribute(statement.targets[0])
+            call = statement.value
+            if name == None or not isinstance(call.func, ast.Attribute) or not isinstance(call.func.value, ast.Name) \
+               or call.func.value.id not in ("tk", "ttk") or len(call.args) == 0:
+                continue
+            widgetclass = call.func.attr
+            #ttk class names (TCombobox) written by older versions
+            if widgetclass.startswith("T") and widgetclass[1:] in ttkWidgets:
+                widgetclass = widgetclass[1:]
+            if widgetclass not in widgetClasses:
+                raise ValueError("Unknown widget class %s at line %d" % (widgetclass, statement.lineno))
+            parent = selfAttribute(call.args[0])
+            if parent == "root":
+                parent = None
+            elif parent not in records:
+                raise ValueError("Unknown parent for %s at line %d" % (name, statement.lineno))
+            options = callOptions(call, 1, variables)
+            options = dict(database.get(options.get("class", widgetclass), {}), **options)
+            records[name] = [widgetclass, name, parent, LAYOUT_PLACE, options, {}]
+            continue
+
+        if not isinstance(statement, ast.Expr) or not isinstance(statement.value, ast.Call) \
+           or not isinstance(statement.value.func, ast.Attribute):
+            continue
+        call = statement.value
+        method = call.func.attr
+        if method == "option_add" and selfAttribute(call.func.value) == "root" and len(call.args) == 2:
+            try:
+                pattern = ast.literal_eval(call.args[0])
+                value = ast.literal_eval(call.args[1])
+            except ValueError:
+                raise ValueError("Unsupported statement at line %d" % call.lineno)
+            widgetclass, _, databaseName = str(pattern).lstrip("*").partition(".")
+            if databaseName in databaseOptions:
+                database.setdefault(widgetclass, {})[databaseOptions[databaseName]] = str(value)
+            continue
+        record = records.get(selfAttribute(call.func.value))
+        if record == None:
+            continue
+
+        if method in ("config", "configure"):
+            record[4].update(callOptions(call))
+        elif method in layoutCalls:
+            layout = layoutCalls[method]
+            options = callOptions(call)
+            if record[3] != layout:
+                record[3] = layout
+                record[5] = {}
+            if method in ("place", "grid", "pack"):
+                base = layoutBaseOptions[layout]
+                options = {key: value for key, value in options.items() if base.get(key) != value}
+            record[5].update(options)
+        elif method == "add" and len(call.args) > 0:
+            #Notebook tab: self.notebook.add(self.child, text=...)
+            child = records.get(selfAttribute(call.args[0]))
+            if child != None:
+                child[3] = LAYOUT_TAB
+                child[5] = callOptions(call, 1)
+
+    #older backups did not add the children of a Notebook as tabs
+    for record in records.values():
+        if record[2] != None and records[record[2]][0] == "Notebook" and record[3] != LAYOUT_TAB:
+            record[3] = LAYOUT_TAB
+            record[5] = {"text": record[1]}
+    return list(records.values())
+
+# -----------------------------------------------------------------------------------------------
+# Build a document from the parsed records
+# -----------------------------------------------------------------------------------------------
+def documentFromRecords(records):
+    document = Document()
+    nodes = {}
+    for widgetclass, name, parent, layout, options, layoutOptions in records:
+        checkNode(widgetclass, name, nodes.get(parent), layout)
+        nodes[name] = document.addNode(widgetclass, name, nodes.get(parent), layout, options, layoutOptions)
+    return document
+
+# -----------------------------------------------------------------------------------------------
+# Load a backup file as a document
+# The parsed file is kept while its modification time and size do not change
+# -----------------------------------------------------------------------------------------------
+def loadBackup(path):
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = backupCache.get(path)
+    if cached == None or cached[0] != signature:
+        with open(path, "r", encoding="utf-8") as f:
+            records = parseBackup(f.read(), path)
+        cached = (signature, records)
+        backupCache[path] = cached
+    return documentFromRecords(cached[1])
@@ -0,0 +1,246 @@
+# Description: Benchmarks of the editor on synthetic designs
+#
+#   python tkmakerBenchmark.py --sizes 10,100,1000 -o results.json --baseline baseline.json
+#
+# The designs are built through MainWindow, so a display is needed: without DISPLAY a virtual
+# X server (Xvfb) is started for the run. The results are written as JSON and compared with a
+# baseline saved by an earlier run (--save-baseline), a slower operation is reported as a regression.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DESIGNS = ["flat", "nested", "mixed", "notebook"]
+SIZES = [10, 100, 1000, 10000]
+SAMPLES = 50 #Number of widgets selected and highlighted by design
+NOISE = 0.001 #Differences below this duration (seconds) are never regressions
+
+# Widgets cycled by the designs, they have no children
+LEAVES = ["LABEL", "BUTTON", "ENTRY", "CHECKBUTTON", "COMBOBOX"]
+
+
+# -----------------------------------------------------------------------------------------------
+# Synthetic designs, lists of (type, name, parent name, layout) with parents first
+# All the children of a container use the same layout method, the widgets of a Notebook are tabs
+# -----------------------------------------------------------------------------------------------
+def flatDesign(size):
+    return [(LEAVES[i % len(LEAVES)], "w" + str(i), None, 1) for i in range(size)]
+
+def nestedDesign(size):
+    #a chain of frames, each level holds some widgets and the next frame
+    depth = max(1, min(64, size // 10))
+    design = []
+    for level in range(depth):
+        design.append(("FRAME", "frm" + str(level), "frm" + str(level - 1) if level > 0 else None, 3))
+    for i in range(size - depth):
+        design.append((LEAVES[i % len(LEAVES)], "w" + str(i), "frm" + str(i % depth), 3))
+    return design
+
+def mixedDesign(size):
+    #frames using place, grid and pack in turn
+    groups = max(1, size // 20)
+    design = [("FRAME", "frm" + str(group), None, 3) for group in range(groups)]
+    for i in range(size - groups):
+        group = i % groups
+        design.append((LEAVES[i % len(LEAVES)], "w" + str(i), "frm" + str(group), group % 3 + 1))
+    return design
+
+def notebookDesign(size):
+    #notebooks of 5 tabs, each tab is a frame holding the widgets
+    notebooks = max(1, size // 50)
+    design = [("NOTEBOOK", "nbk" + str(n), None, 3) for n in range(notebooks)]
+    tabs = notebooks * 5
+    design += [("FRAME", "tab" + str(t), "nbk" + str(t // 5), 3) for t in range(tabs)]
+    for i in range(max(0, size - notebooks - tabs)):
+        design.append((LEAVES[i % len(LEAVES)], "w" + str(i), "tab" + str(i % tabs), 3))
+    return design
+
+designBuilders = {"flat": flatDesign, "nested": nestedDesign, "mixed": mixedDesign, "notebook": notebookDesign}
+
+
+# -----------------------------------------------------------------------------------------------
+# Start a virtual X server when there is no display, returns the process or None
+# -----------------------------------------------------------------------------------------------
+def startXvfb():
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    if shutil.which("Xvfb") == None:
+        raise SystemExit("tkmakerBenchmark: no display and Xvfb is not installed")
+    #Xvfb writes the display number it uses when it is ready
+    read, write = os.pipe()
+    process = subprocess.Popen(["Xvfb", "-displayfd", str(write), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               pass_fds=(write,), stderr=subprocess.DEVNULL)
+    os.close(write)
+    with os.fdopen(read) as f:
+        display = f.readline().strip()
+    if not display:
+        process.terminate()
+        raise SystemExit("tkmakerBenchmark: Xvfb did not start")
+    os.environ["DISPLAY"] = ":" + display
+    return process
+
+# -----------------------------------------------------------------------------------------------
+# Duration of a function call (seconds)
+# -----------------------------------------------------------------------------------------------
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+# -----------------------------------------------------------------------------------------------
+# Run the operations of the editor on one design, returns the duration of each (seconds)
+# -----------------------------------------------------------------------------------------------
+def runDesign(app, design, workdir):
+    import tkmaker
+    import tkmakerBackup
+    import tkmakerCodegen
+    import tkmakerProject
+    results = {}
+    app.clearProject()
+    app.root.update()
+
+    #addWidget, the parents are found by name
+    start = time.perf_counter()
+    for widgettype, name, parent, layout in design:
+        parentwidget = tkmaker.widgetList[app.document.findByName(parent).id] if parent != None else None
+        if app.addWidget(tkmaker.WidgetType[widgettype], name, layout, parentwidget) == None:
+            raise RuntimeError("the widget %s of the design was not added" % name)
+    results["addWidget"] = time.perf_counter() - start
+    results["addWidget_per_widget"] = results["addWidget"] / len(design)
+    start = time.perf_counter()
+    app.root.update()
+    results["first_draw"] = time.perf_counter() - start
+
+    #selection (treeview, panels) and highlight of a sample of the widgets
+    nodes = list(app.document.nodes.values())
+    sample = [tkmaker.widgetList[node.id] for node in nodes[::max(1, len(nodes) // SAMPLES)]]
+    durations = []
+    for widget in sample:
+        durations.append(timed(app.setSelection, [widget]))
+    results["select"] = statistics.median(durations)
+    durations = []
+    for widget in sample:
+        app.setSelection([widget])
+        durations.append(timed(app.displayOptions))
+    results["displayOptions"] = statistics.median(durations)
+    durations = []
+    for widget in sample:
+        #the geometry of the widget is read again
+        app.geometryCache.clear()
+        app.highlight_widget(widget)
+        durations.append(timed(app.scheduler.flush))
+    results["highlight_widget"] = statistics.median(durations)
+    app.setSelection([])
+
+    #code generation in both modes
+    for mode in ("EXPORT", "BACKUP"):
+        results["generateCode_" + mode] = timed(tkmakerCodegen.generateCode, app.document, mode)
+
+    #loading of the saved design, as the open menu does
+    projectpath = os.path.join(workdir, "design.tkm")
+    tkmakerProject.saveProject(app.document, projectpath)
+    backuppath = os.path.join(workdir, "design.py")
+    with open(backuppath, "w", encoding="utf-8") as f:
+        f.write(tkmakerCodegen.generateCode(app.document, "BACKUP"))
+    results["open_file_project"] = timed(app.loadFile, projectpath)
+    tkmakerBackup.backupCache.clear()
+    results["open_file_backup"] = timed(app.loadFile, backuppath)
+    return results
+
+# -----------------------------------------------------------------------------------------------
+# Run the benchmarks, the median of the repeated runs is kept
+# -----------------------------------------------------------------------------------------------
+def runBenchmarks(designs, sizes, repeat, quiet=False):
+    import tkinter as tk
+    import tkmaker
+    root = tk.Tk()
+    app = tkmaker.MainWindow(root)
+    #the errors of the editor stop the benchmark instead of opening a dialog
+    def showError(message):
+        raise RuntimeError(message)
+    app.showError = showError
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for designname in designs:
+                for size in sizes:
+                    design = designBuilders[designname](size)
+                    runs = [runDesign(app, design, workdir) for i in range(repeat)]
+                    key = "%s/%d" % (designname, size)
+                    results[key] = {operation: statistics.median(run[operation] for run in runs) for operation in runs[0]}
+                    if not quiet:
+                        print("%-16s %s" % (key, "  ".join("%s=%.4f" % item for item in results[key].items())))
+    finally:
+        root.destroy()
+    return {"format": "tkmaker-benchmark", "version": 1,
+            "python": platform.python_version(), "tk": str(tk.TkVersion), "platform": platform.platform(),
+            "repeat": repeat, "results": results}
+
+# -----------------------------------------------------------------------------------------------
+# Compare results with a baseline, returns the regressions as (key, operation, baseline, current)
+# -----------------------------------------------------------------------------------------------
+def compareResults(results, baseline, tolerance):
+    regressions = []
+    for key, operations in results["results"].items():
+        reference = baseline["results"].get(key, {})
+        for operation, duration in operations.items():
+            if operation not in reference:
+                continue
+            if duration > reference[operation] * (1 + tolerance) and duration - reference[operation] > NOISE:
+                regressions.append((key, operation, reference[operation], duration))
+    return regressions
+
+# -----------------------------------------------------------------------------------------------
+# Entry point, returns the exit code (1 if there is a regression)
+# -----------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tkmakerBenchmark", description="Benchmarks of the TkMaker editor")
+    parser.add_argument("--designs", default=",".join(DESIGNS), help="designs to build (default: %(default)s)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES), help="number of widgets of the designs (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each design, the median is kept (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="JSON file of the results")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--save-baseline", help="also write the results to this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a regression (default: %(default)s)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the regressions")
+    args = parser.parse_args(argv)
+
+    designs = args.designs.split(",")
+    for design in designs:
+        if design not in designBuilders:
+            parser.error("unknown design %r" % design)
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    xvfb = startXvfb()
+    try:
+        results = runBenchmarks(designs, sizes, args.repeat, args.quiet)
+    finally:
+        if xvfb != None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compareResults(results, baseline, args.tolerance)
+        for key, operation, reference, duration in regressions:
+            print("regression: %s %s %.4f s -> %.4f s (%+.0f%%)" % (key, operation, reference, duration,
+                  (duration / reference - 1) * 100 if reference else 100), file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
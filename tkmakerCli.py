@@ -0,0 +1,121 @@
+# Description: Command line tools of TkMaker, they run without the editor window (and without a display)
+#
+#   python -m tkmaker export in/*.py -o out/
+#
+# The projects (.tkm) and backups (.py) are converted to export code by a pool of processes
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import tkmakerBackup
+import tkmakerCodegen
+import tkmakerProject
+
+
+# -----------------------------------------------------------------------------------------------
+# Load a project or a backup as a document
+# -----------------------------------------------------------------------------------------------
+def loadFile(path):
+    if path.endswith(".py"):
+        return tkmakerBackup.loadBackup(path)
+    return tkmakerProject.loadProject(path)
+
+# -----------------------------------------------------------------------------------------------
+# Path of the code exported from a file: the name of the file with .py, in the output directory
+# -----------------------------------------------------------------------------------------------
+def outputPath(path, outputdir):
+    return os.path.join(outputdir, os.path.splitext(os.path.basename(path))[0] + ".py")
+
+# -----------------------------------------------------------------------------------------------
+# Export one file, returns (path, output path, error message)
+# Called in the worker processes, so the errors are returned instead of raised
+# -----------------------------------------------------------------------------------------------
+def exportFile(path, outputdir, mode="EXPORT", lazyTabs=False):
+    outputpath = outputPath(path, outputdir)
+    if os.path.abspath(outputpath) == os.path.abspath(path):
+        return path, None, "the export would overwrite the backup"
+    try:
+        tkmakerCodegen.writeCode(loadFile(path), outputpath, mode, lazyTabs)
+    except (OSError, ValueError) as error:
+        return path, None, str(error)
+    return path, outputpath, None
+
+# -----------------------------------------------------------------------------------------------
+# export command
+# -----------------------------------------------------------------------------------------------
+def exportCommand(args):
+    #the patterns are expanded here too, for the shells that do not do it
+    files = []
+    for pattern in args.files:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(matches)
+    if not files:
+        print("tkmaker: no file to export", file=sys.stderr)
+        return 1
+
+    #a file given twice (by two patterns) is exported once, but two files can not write the same
+    #output (a/x.tkm and b/x.tkm, or x.tkm and x.py): nothing is exported
+    key = lambda path: os.path.normcase(os.path.abspath(path))
+    files = list({key(path): path for path in reversed(files)}.values())[::-1]
+    outputs = {}
+    for path in files:
+        outputs.setdefault(key(outputPath(path, args.output)), []).append(path)
+    duplicates = [paths for paths in outputs.values() if len(paths) > 1]
+    for paths in duplicates:
+        print("tkmaker: %s would be exported to the same file %s" % (", ".join(paths), outputPath(paths[0], args.output)), file=sys.stderr)
+    if duplicates:
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    jobs = min(jobs, len(files))
+    outputdirs = [args.output] * len(files)
+    modes = [args.mode] * len(files)
+    lazyTabs = [args.lazy_tabs] * len(files)
+    if jobs == 1:
+        results = map(exportFile, files, outputdirs, modes, lazyTabs)
+    else:
+        #the files are sent by chunks so a worker does not wait for each small file
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(exportFile, files, outputdirs, modes, lazyTabs, chunksize=max(1, len(files) // (jobs * 4)))
+
+    errors = 0
+    try:
+        for path, outputpath, error in results:
+            if error:
+                errors += 1
+                print("tkmaker: %s: %s" % (path, error), file=sys.stderr)
+            elif not args.quiet:
+                print("%s -> %s" % (path, outputpath))
+    finally:
+        if jobs > 1:
+            pool.shutdown()
+    return 1 if errors else 0
+
+# -----------------------------------------------------------------------------------------------
+# Entry point of the command line, returns the exit code
+# -----------------------------------------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tkmaker", description="TkMaker command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="export projects (.tkm) or backups (.py) to Python code")
+    export.add_argument("files", nargs="+", help="files or glob patterns to export")
+    export.add_argument("-o", "--output", default=".", help="output directory (default: current directory)")
+    export.add_argument("--mode", choices=["EXPORT", "TCL"], default="EXPORT",
+                        help="EXPORT: tkinter code, TCL: widgets created by one Tcl script (default: %(default)s)")
+    export.add_argument("--lazy-tabs", action="store_true",
+                        help="build the content of the Notebook tabs when they are first selected (EXPORT)")
+    export.add_argument("-j", "--jobs", type=int, default=None, help="number of processes (default: number of CPUs)")
+    export.add_argument("-q", "--quiet", action="store_true", help="only print the errors")
+    export.set_defaults(func=exportCommand)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
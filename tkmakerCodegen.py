@@ -0,0 +1,410 @@
+# Description: Python code generation from the document model
+# Everything is read from the document, no Tcl call is needed, so the code can be generated without a display
+#
+#   EXPORT  application class creating the widgets with tkinter
+#   BACKUP  same code with the names of the widgets, read back by tkmakerBackup
+#   TCL     application class creating all the widgets with a single Tcl script
+
+import keyword
+import math
+from collections import Counter
+
+from tkmakerConfig import ttkWidgets, toplevelClasses, optionDatabaseNames
+from tkmakerFiles import replaceFile
+from tkmakerModel import LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK, LAYOUT_TAB
+
+# Options written to create the layout, the options of the document replace them
+layoutBaseOptions = {LAYOUT_PLACE: {"x": "0", "y": "0"},
+                     LAYOUT_GRID: {"row": "0", "column": "0"}}
+
+WRITE_BUFFER_SIZE = 256 * 1024 #Size of the buffer of the written files (bytes)
+FRAGMENT_CACHE_SIZE = 100000 #Number of widget fragments kept, the cache is emptied beyond
+SHARED_MIN = 3 #Number of widgets from which a set of options is written once (EXPORT)
+
+
+# Code of the widgets already generated by (mode, node id): (key, code), the key holds the version
+# of the node and what else the code depends on. A changed widget is the only one generated again
+fragmentCache = {}
+
+# Characters written as they are in a Tcl word, the others are escaped
+tclSafeCharacters = set("_.,:+-/#@%=")
+
+# Tcl command of each layout method
+tclLayoutCommands = {LAYOUT_PLACE: "place", LAYOUT_GRID: "grid", LAYOUT_PACK: "pack"}
+
+
+# -----------------------------------------------------------------------------------------------
+# Generate code for EXPORT, BACKUP or TCL, as a string
+# With lazyTabs (EXPORT), the content of each Notebook tab is created by a builder method of the
+# application, run the first time the tab is selected. The first tab of a Notebook is built at once
+# -----------------------------------------------------------------------------------------------
+def generateCode(document, mode="EXPORT", lazyTabs=False):
+    return "".join(iterCode(document, mode, lazyTabs))
+
+# -----------------------------------------------------------------------------------------------
+# Write the code to a file, through a temporary file of the same folder renamed at the end
+# (replaceFile), so the file is never left half written. The chunks are written as they are generated
+# -----------------------------------------------------------------------------------------------
+def writeCode(document, path, mode="EXPORT", lazyTabs=False):
+    with replaceFile(path, WRITE_BUFFER_SIZE) as f:
+        for chunk in iterCode(document, mode, lazyTabs):
+            f.write(chunk)
+
+# -----------------------------------------------------------------------------------------------
+# Generate the code as chunks (a few lines each), the whole file is never held in memory
+# -----------------------------------------------------------------------------------------------
+def iterCode(document, mode="EXPORT", lazyTabs=False):
+    if mode == "TCL":
+        yield from iterTclCode(document)
+        return
+    result = ""
+    result += "import tkinter as tk\n"
+    result += "from tkinter import ttk\n"
+    result += "from tkinter import messagebox\n"
+    result += "from tkinter import colorchooser\n"
+    result += "\n"
+    if mode == "BACKUP":
+        result += "class Backup:\n"
+        shares = {}
+        lazyTabs = False
+    else:
+        #the dicts of shared options are global, the tab builders use them too
+        database, sharedSets, shares = sharedOptions(list(document.walk()))
+        for variable, options in sharedSets:
+            result += variable + " = {" + ", ".join(repr(key) + ": " + literal(value) for key, value in options.items()) + "}\n"
+        if sharedSets:
+            result += "\n"
+        result += "class MainWindow:\n"
+
+    result += "    def __init__(self, root):\n"
+    result += "        self.root = root\n"
+    if mode != "BACKUP":
+        result += "        self.root.title(\"Tkinter Editor\")\n"
+        result += "        self.root.geometry(\"800x600\")\n"
+        for pattern, value in database:
+            result += "        self.root.option_add(" + repr(pattern) + ", " + literal(value) + ")\n"
+    else:
+        result += "        self.widgetnames = {}\n"
+    lazyTabs = lazyTabs and any(node.layout == LAYOUT_TAB and node.children for node in document.walk())
+    if lazyTabs:
+        result += "        self.tabBuilders = {} #builders of the tabs not selected yet, by path\n"
+    yield result
+
+    #the tabs met while writing a method get a builder method written after it
+    tabs = []
+    yield from iterNodes(document.roots, mode, shares, lazyTabs, tabs)
+    if lazyTabs:
+        result = "\n"
+        result += "    def buildTab(self, event):\n"
+        result += "        builder = self.tabBuilders.pop(str(event.widget.select()), None)\n"
+        result += "        if builder != None:\n"
+        result += "            builder()\n"
+        yield result
+        for tab in tabs:
+            yield "\n    def build_" + tab.name + "(self):\n"
+            yield from iterNodes(tab.children, mode, shares, lazyTabs, tabs)
+
+    result = "\n"
+    if mode != "BACKUP":
+        result += "if __name__ == \"__main__\":\n"
+        result += "    root = tk.Tk()\n"
+        result += "    app = MainWindow(root)\n"
+        result += "    root.mainloop()\n"
+    yield result
+
+# -----------------------------------------------------------------------------------------------
+# Generate the lines creating the nodes and their children, one chunk by node
+# a parent is always created before its children, and the siblings keep their order (pack, tabs)
+# With lazyTabs, the children of a tab are not written, the tab is added to tabs to get a builder
+# method (the outer tabs before the tabs they contain)
+# -----------------------------------------------------------------------------------------------
+def iterNodes(nodes, mode, shares, lazyTabs, tabs):
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        result = widgetFragment(node, mode, shares.get(node.id))
+        if not lazyTabs:
+            stack.extend(reversed(node.children))
+        elif node.widgetClass == "Notebook" and any(tab.children for tab in node.children[1:]):
+            result += "        self." + node.name + ".bind(\"<<NotebookTabChanged>>\", self.buildTab)\n"
+            stack.extend(reversed(node.children))
+        elif node.layout == LAYOUT_TAB and node.children:
+            tabs.append(node)
+            if node is node.parent.children[0]:
+                result += "        self.build_" + node.name + "()\n"
+            else:
+                result += "        self.tabBuilders[str(self." + node.name + ")] = self.build_" + node.name + "\n"
+        else:
+            stack.extend(reversed(node.children))
+        yield result
+
+# -----------------------------------------------------------------------------------------------
+# Lines creating one widget, from the cache when the widget, its parent name and its shared options
+# did not change
+# -----------------------------------------------------------------------------------------------
+def widgetFragment(node, mode, shared=None):
+    parent = None if node.parent is None else node.parent.name
+    sharedKey = None if shared is None else (shared[0], frozenset(shared[1]))
+    return cachedFragment(mode, node, (node.version, parent, sharedKey), generateWidgetCode, node, mode, shared)
+
+def cachedFragment(mode, node, key, function, *args):
+    cached = fragmentCache.get((mode, node.id))
+    if cached != None and cached[0] == key:
+        return cached[1]
+    if len(fragmentCache) >= FRAGMENT_CACHE_SIZE:
+        fragmentCache.clear()
+    code = function(*args)
+    fragmentCache[(mode, node.id)] = (key, code)
+    return code
+
+# -----------------------------------------------------------------------------------------------
+# Generate the lines creating one widget
+# -----------------------------------------------------------------------------------------------
+# shared is (variable, keys): the options of keys are not written, they come from the option
+# database or from the dict of the variable, given as **variable (None when no option is shared)
+# -----------------------------------------------------------------------------------------------
+def generateWidgetCode(node, mode="EXPORT", shared=None):
+    name = "self." + node.name
+    if node.parent is None:
+        parent = "self.root"
+    else:
+        parent = "self." + node.parent.name
+    #the dict of shared options is unpacked as keywords, the ttk constructors only take the master
+    args = [parent]
+    options = node.options
+    if shared != None:
+        variable, keys = shared
+        if variable != None:
+            args.append("**" + variable)
+        options = {key: value for key, value in options.items() if key not in keys}
+
+    #Widget creation function, the options are given to the constructor
+    if node.widgetClass in ttkWidgets:
+        result = "        " + name + " = ttk." + node.widgetClass + "(" + callArguments(args, options) + ")\n"
+    else:
+        result = "        " + name + " = tk." + node.widgetClass + "(" + callArguments(args, options) + ")\n"
+
+    #if we are in backup mode we add the widget name to the widgetnames list
+    if mode == "BACKUP":
+        result += "        self.widgetnames[str(" + name + ".winfo_id())] = \"" + node.name + "\"\n"
+
+    #Layout parameters, in a single call (a Toplevel or a Menu is not managed)
+    if node.widgetClass in toplevelClasses:
+        return result
+    if node.layout == LAYOUT_TAB:
+        result += "        " + parent + ".add(" + callArguments([name], node.layoutOptions) + ")\n"
+        return result
+    if node.layout == LAYOUT_PLACE:
+        method = ".place("
+    elif node.layout == LAYOUT_GRID:
+        method = ".grid("
+    else:
+        method = ".pack("
+    options = dict(layoutBaseOptions.get(node.layout, {}))
+    options.update(node.layoutOptions)
+    result += "        " + name + method + callArguments([], options) + ")\n"
+    return result
+
+# -----------------------------------------------------------------------------------------------
+# Options shared by many widgets, written once in EXPORT mode
+# An option having the same value on all the tk widgets of a class (at least SHARED_MIN) goes to
+# the option database, as a (pattern, value) entry. Then a set of options found on SHARED_MIN
+# widgets or more (tk or ttk) is written in a dict given to their constructor.
+# Returns the entries, the sets as (variable, options) and the (variable, keys) of each widget id
+# -----------------------------------------------------------------------------------------------
+def sharedOptions(nodes):
+    #options of the database of each widget, the aliases (bg, background) must agree
+    classes = {}
+    for node in nodes:
+        if node.widgetClass in ttkWidgets:
+            continue
+        values = {}
+        for key, value in node.options.items():
+            name = optionDatabaseNames.get(key)
+            if name != None:
+                values[name] = value if values.get(name, value) == value else None
+        classes.setdefault(node.options.get("class", node.widgetClass), []).append((node, values))
+
+    database = []
+    hoisted = {}
+    for widgetclass, items in classes.items():
+        if len(items) < SHARED_MIN:
+            continue
+        for name, value in items[0][1].items():
+            if value != None and all(values.get(name) == value for node, values in items):
+                database.append(("*" + widgetclass + "." + name, value))
+                for node, values in items:
+                    hoisted.setdefault(node.id, set()).update(key for key in node.options if optionDatabaseNames.get(key) == name)
+
+    #options left on each widget, then the sets made of the pairs found on SHARED_MIN widgets
+    remaining = {node.id: {key: value for key, value in node.options.items() if key not in hoisted.get(node.id, ())} for node in nodes}
+    counts = Counter(pair for options in remaining.values() for pair in options.items())
+    common = {}
+    for node in nodes:
+        pairs = frozenset(pair for pair in remaining[node.id].items() if counts[pair] >= SHARED_MIN)
+        if len(pairs) >= 2:
+            common[node.id] = pairs
+    setCounts = Counter(common.values())
+    variables = {}
+    sharedSets = []
+    shares = {}
+    for node in nodes:
+        pairs = common.get(node.id)
+        variable = None
+        if pairs != None and setCounts[pairs] >= SHARED_MIN:
+            if pairs not in variables:
+                variables[pairs] = "options" + str(len(variables) + 1)
+                sharedSets.append((variables[pairs], dict(sorted(pairs))))
+            variable = variables[pairs]
+        keys = set(hoisted.get(node.id, ()))
+        if variable != None:
+            keys.update(key for key, value in pairs)
+        if keys:
+            shares[node.id] = (variable, keys)
+    return database, sharedSets, shares
+
+# -----------------------------------------------------------------------------------------------
+# Arguments of a call: the positional arguments, then the options as keywords
+# A keyword of Python gets a trailing _ (class_=), tkinter removes it. An option which is not
+# an identifier is given in a ** dict
+# -----------------------------------------------------------------------------------------------
+def callArguments(args, options):
+    others = {}
+    keywords = []
+    for key, value in options.items():
+        if not key.isidentifier():
+            others[key] = value
+        elif keyword.iskeyword(key):
+            keywords.append(key + "_=" + literal(value))
+        else:
+            keywords.append(key + "=" + literal(value))
+    if others:
+        keywords.append("**{" + ", ".join(repr(key) + ": " + literal(value) for key, value in others.items()) + "}")
+    return ", ".join(list(args) + keywords)
+
+# -----------------------------------------------------------------------------------------------
+# Python literal of an option value (str in the document)
+# Numbers are written as int or float when they give back the same string, the other values as str
+# -----------------------------------------------------------------------------------------------
+def literal(value):
+    try:
+        if str(int(value)) == value:
+            return value
+    except ValueError:
+        pass
+    try:
+        #inf and nan are not literals
+        if repr(float(value)) == value and math.isfinite(float(value)):
+            return value
+    except ValueError:
+        pass
+    return repr(value)
+
+# -----------------------------------------------------------------------------------------------
+# Generate code for TCL: the widgets are created by one Tcl script, evaluated with a single call
+# instead of one call to Tcl for each widget and option. The attributes of the application are
+# tkinter objects bound to the widgets created by the script
+# -----------------------------------------------------------------------------------------------
+def iterTclCode(document):
+    result = ""
+    result += "import tkinter as tk\n"
+    result += "from tkinter import ttk\n"
+    result += "from tkinter import messagebox\n"
+    result += "from tkinter import colorchooser\n"
+    result += "\n"
+    #the characters of the script needing it are escaped with a backslash, so it is a raw string
+    result += "TCL_SCRIPT = r\"\"\"\n"
+    yield result
+    paths = {}
+    for node in document.walk():
+        #the path is relative to the root window, given to the script as $r ("" for ".")
+        parent = "$r" if node.parent is None else paths[node.parent.id]
+        paths[node.id] = parent + "." + tclPathName(node.name)
+        yield cachedFragment("TCL", node, (node.version, paths[node.id]), generateTclWidgetCode, node, paths[node.id], parent)
+
+    result = "\"\"\"\n"
+    result += "\n"
+    result += "def tclWidget(widgetclass, master, name):\n"
+    result += "    #tkinter object of a widget created by the script, the widget is not created again\n"
+    result += "    widget = widgetclass.__new__(widgetclass)\n"
+    result += "    tk.BaseWidget._setup(widget, master, {\"name\": name})\n"
+    result += "    return widget\n"
+    result += "\n"
+    result += "class MainWindow:\n"
+    result += "    def __init__(self, root):\n"
+    result += "        self.root = root\n"
+    result += "        self.root.title(\"Tkinter Editor\")\n"
+    result += "        self.root.geometry(\"800x600\")\n"
+    result += "        self.root.tk.call(\"apply\", (\"r\", TCL_SCRIPT), \"\" if str(self.root) == \".\" else str(self.root))\n"
+    yield result
+    for node in document.walk():
+        if node.widgetClass in ttkWidgets:
+            widgetclass = "ttk." + node.widgetClass
+        else:
+            widgetclass = "tk." + node.widgetClass
+        master = "self.root" if node.parent is None else "self." + node.parent.name
+        yield "        self." + node.name + " = tclWidget(" + widgetclass + ", " + master + ", " + repr(tclPathName(node.name)) + ")\n"
+
+    result = "\n"
+    result += "if __name__ == \"__main__\":\n"
+    result += "    root = tk.Tk()\n"
+    result += "    app = MainWindow(root)\n"
+    result += "    root.mainloop()\n"
+    yield result
+
+# -----------------------------------------------------------------------------------------------
+# Generate the Tcl commands creating one widget
+# -----------------------------------------------------------------------------------------------
+def generateTclWidgetCode(node, path, parent):
+    if node.widgetClass in ttkWidgets:
+        command = "ttk::" + node.widgetClass.lower()
+    else:
+        command = node.widgetClass.lower()
+    result = command + " " + path + tclOptions(node.options) + "\n"
+    if node.widgetClass in toplevelClasses:
+        return result
+    if node.layout == LAYOUT_TAB:
+        result += parent + " add " + path + tclOptions(node.layoutOptions) + "\n"
+        return result
+    options = dict(layoutBaseOptions.get(node.layout, {}))
+    options.update(node.layoutOptions)
+    result += tclLayoutCommands[node.layout] + " " + path + tclOptions(options) + "\n"
+    return result
+
+# -----------------------------------------------------------------------------------------------
+# Name of a widget in its Tcl path, a window name can not start with an uppercase letter
+# The names starting with an uppercase letter or with _ get a _ in front, so two names never give
+# the same path (Abc is _Abc, _Abc is __Abc)
+# -----------------------------------------------------------------------------------------------
+def tclPathName(name):
+    if name[:1].isupper() or name[:1] == "_":
+        return "_" + name
+    return name
+
+def tclOptions(options):
+    return "".join(" -" + key + " " + tclQuote(value) for key, value in options.items())
+
+# -----------------------------------------------------------------------------------------------
+# Tcl word of a value: the special characters (spaces, braces, brackets, $, quotes, backslashes)
+# are escaped, so no substitution is made
+# -----------------------------------------------------------------------------------------------
+def tclQuote(value):
+    if value == "":
+        return "{}"
+    result = ""
+    for character in value:
+        if character.isalnum() or character in tclSafeCharacters:
+            result += character
+        elif character == "\n":
+            result += "\\n"
+        elif character == "\t":
+            result += "\\t"
+        elif ord(character) > 0xFFFF:
+            #not special for Tcl, and Tcl 8.6 reads the \U escapes of these characters wrong
+            result += character
+        elif not character.isprintable():
+            #the other control characters (\r, \0...) would be written as they are in the script
+            result += "\\u%04x" % ord(character)
+        else:
+            result += "\\" + character
+    return result
@@ -32,6 +32,40 @@ listProperties = { "relief": ["","flat","groove","raised","ridge","solid","sunke
                    }
 
 
+# Options of the tk widgets that can be set through the option database, with their database name
+# (the aliases have the name of the option they stand for)
+optionDatabaseNames = {"activebackground": "activeBackground",
+                       "activeforeground": "activeForeground",
+                       "anchor": "anchor",
+                       "background": "background",
+                       "bg": "background",
+                       "borderwidth": "borderWidth",
+                       "bd": "borderWidth",
+                       "compound": "compound",
+                       "cursor": "cursor",
+                       "disabledforeground": "disabledForeground",
+                       "font": "font",
+                       "foreground": "foreground",
+                       "fg": "foreground",
+                       "height": "height",
+                       "highlightbackground": "highlightBackground",
+                       "highlightcolor": "highlightColor",
+                       "highlightthickness": "highlightThickness",
+                       "insertbackground": "insertBackground",
+                       "justify": "justify",
+                       "overrelief": "overRelief",
+                       "padx": "padX",
+                       "pady": "padY",
+                       "relief": "relief",
+                       "selectbackground": "selectBackground",
+                       "selectcolor": "selectColor",
+                       "selectforeground": "selectForeground",
+                       "state": "state",
+                       "takefocus": "takeFocus",
+                       "troughcolor": "troughColor",
+                       "width": "width",
+                       "wraplength": "wrapLength"}
+
 # Layout options filled with a list of predefined values
 layoutOptions = { "anchor": ["n","ne","e","se","s","sw","w","nw","center"],
                    "expand": [0,1],
@@ -42,9 +76,23 @@ layoutOptions = { "anchor": ["n","ne","e","se","s","sw","w","nw","center"],
                    }
 
 # Properties hidden, as they can ot be changed or they already exist with anothe name
-hidenProperties = ["background","foreground","class","visual","borderwidth","highlightcolor","colormap","container"]
+# (the aliases bg, fg, bd are not displayed, the options they stand for are)
+hidenProperties = ["class","visual","highlightcolor","colormap","container"]
 hidenLayoutOptions = ["in"]
 
+# Options of the tabs of a Notebook (ttk.Notebook.add)
+tabOptions = ["state","sticky","padding","text","image","compound","underline"]
+
+# Widget classes that can contain other widgets
+containerClasses = ["Frame","Notebook"]
+
+# Widget classes that are windows of their own, they are not managed by place, grid or pack
+toplevelClasses = ["Toplevel","Menu"]
+
+# Undo/redo history: memory used by the changes (bytes) and number of changes kept
+historyMaxSize = 1024 * 1024
+historyMaxChanges = 1000
+
 
 
 ttkWidgets= [
@@ -53,7 +101,9 @@ ttkWidgets= [
             "Progressbar",
             "Separator",
             "Sizegrip",
-            "Treeview"]
+            "Treeview",
+            "Panedwindow",
+            "Labelframe"]
 
 class WidgetType(Enum):
     FRAME = 'Frame'
@@ -0,0 +1,35 @@
+# Description: Writing of the files saved by TkMaker (projects, exported code)
+# A file is written to a temporary file of its directory, renamed at the end over the previous one,
+# so an error or a crash never leaves a partial file
+
+import contextlib
+import os
+import stat
+import tempfile
+
+
+# -----------------------------------------------------------------------------------------------
+# Text file replacing path when the with block ends without error
+# The file keeps the mode of the file it replaces, a new file gets the mode of open() (umask)
+#
+#   with replaceFile(path) as f:
+#       f.write(text)
+# -----------------------------------------------------------------------------------------------
+@contextlib.contextmanager
+def replaceFile(path, buffering=-1):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temppath = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", buffering=buffering) as f:
+            yield f
+        try:
+            filemode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            filemode = 0o666 & ~umask
+        os.chmod(temppath, filemode)
+        os.replace(temppath, path)
+    except BaseException:
+        os.unlink(temppath)
+        raise
@@ -0,0 +1,129 @@
+# Description: Undo/redo history of the editor
+# A change is a small delta that can be applied in both directions, the design is never copied:
+#   ("option", id, key, old, new)   widget option override of a node (None: default value)
+#   ("layout", id, key, old, new)   layout option override of a node (None: default value)
+#   ("name", id, old, new)          name of a node
+#   ("add", records)                nodes added, undone by removing them
+#   ("remove", records)             nodes removed, undone by creating them again with the same ids
+#   ("batch", changes)              changes done together (edit of several widgets), undone together
+# A record is (id, widgetClass, name, parentId, index, layout, options, layoutOptions), parents first
+
+import sys
+from collections import deque
+
+
+# -----------------------------------------------------------------------------------------------
+# Records of nodes and of their children, parents first
+# index is the position of the node in the children of its parent
+# -----------------------------------------------------------------------------------------------
+def nodeRecords(document, nodes):
+    records = []
+    for node in nodes:
+        siblings = document.roots if node.parent is None else node.parent.children
+        stack = [(node, siblings.index(node))]
+        while stack:
+            node, index = stack.pop()
+            records.append((node.id, node.widgetClass, node.name, None if node.parent is None else node.parent.id,
+                            index, node.layout, dict(node.options), dict(node.layoutOptions)))
+            stack.extend((child, i) for i, child in reversed(list(enumerate(node.children))))
+    return tuple(records)
+
+# -----------------------------------------------------------------------------------------------
+# Memory used by a change (bytes), the strings and containers are counted
+# -----------------------------------------------------------------------------------------------
+def changeSize(value):
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += changeSize(key) + changeSize(item)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            size += changeSize(item)
+    return size
+
+
+class History:
+    """
+    Undo and redo lists of the changes of the editor.
+    The oldest changes are dropped when the history uses more than maxsize bytes or holds more than
+    maxchanges changes. Consecutive changes of the same option (or name) of a node are merged,
+    so typing in the property panel gives a single change.
+    Attributes:
+        undoList (deque): Changes that can be undone, as (change, size), the last one at the right.
+        redoList (list): Changes undone that can be redone, as (change, size).
+        size (int): Memory used by the changes of both lists.
+        maxsize (int): Memory allowed for the history.
+        maxchanges (int): Number of changes kept in the undo list.
+    Methods:
+        record(change):
+            Adds a change done in the editor, the redo list is cleared.
+        undo():
+            Returns the last change to undo (to apply backwards), None if there is none.
+        redo():
+            Returns the last undone change to apply again, None if there is none.
+        clear():
+            Removes every change.
+    """
+    def __init__(self, maxsize, maxchanges):
+        self.undoList = deque()
+        self.redoList = []
+        self.size = 0
+        self.maxsize = maxsize
+        self.maxchanges = maxchanges
+
+    def __len__(self):
+        return len(self.undoList)
+
+    def record(self, change):
+        for undone, size in self.redoList:
+            self.size -= size
+        self.redoList.clear()
+        if self.undoList:
+            change = self.merge(change)
+            if change == None:
+                return
+        size = changeSize(change)
+        self.undoList.append((change, size))
+        self.size += size
+        #the oldest changes are dropped, the last one is always kept
+        while len(self.undoList) > 1 and (self.size > self.maxsize or len(self.undoList) > self.maxchanges):
+            dropped, size = self.undoList.popleft()
+            self.size -= size
+
+    # -----------------------------------------------------------------------------------------------
+    # Merge a change with the last one when they change the same value of a node
+    # Returns the change to add, None if there is nothing to add
+    # -----------------------------------------------------------------------------------------------
+    def merge(self, change):
+        last, size = self.undoList[-1]
+        if change[0] in ("option", "layout") and last[:3] == change[:3]:
+            change = last[:4] + change[4:]
+        elif change[0] == "name" and last[:2] == change[:2]:
+            change = last[:3] + change[3:]
+        else:
+            return change
+        self.undoList.pop()
+        self.size -= size
+        #the value is back to the value before the first change
+        if change[-2] == change[-1]:
+            return None
+        return change
+
+    def undo(self):
+        if not self.undoList:
+            return None
+        item = self.undoList.pop()
+        self.redoList.append(item)
+        return item[0]
+
+    def redo(self):
+        if not self.redoList:
+            return None
+        item = self.redoList.pop()
+        self.undoList.append(item)
+        return item[0]
+
+    def clear(self):
+        self.undoList.clear()
+        self.redoList.clear()
+        self.size = 0
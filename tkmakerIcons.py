@@ -0,0 +1,24 @@
+# Description: Icons of the editor, decoded the first time they are used
+
+import os
+import tkinter as tk
+
+ICONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons")
+
+
+class IconCache(dict):
+    """
+    Icons of the editor by name (file name without .png).
+    An icon is read from the icons folder of TkMaker (not of the current directory) the first time
+    it is used, then the decoded image is kept.
+    Attributes:
+        master (tk.Widget): Widget owning the images.
+    """
+    def __init__(self, master):
+        super().__init__()
+        self.master = master
+
+    def __missing__(self, name):
+        icon = tk.PhotoImage(master=self.master, file=os.path.join(ICONS_DIR, name + ".png"))
+        self[name] = icon
+        return icon
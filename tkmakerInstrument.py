@@ -0,0 +1,245 @@
+# Description: Opt-in instrumentation of the editor: calls to Tcl and event handlers by operation
+#
+#   python tkmaker.py --instrument               statistics window (Tools menu)
+#   python tkmaker.py --instrument=stats.json    also written to stats.json when the editor is closed
+#   TKMAKER_INSTRUMENT=1 or TKMAKER_INSTRUMENT=stats.json does the same
+#
+# The Tcl interpreter of the main window (root.tk) is replaced by a proxy counting and timing each
+# call, the widgets created after it share the proxy. The calls are grouped by the operation of the
+# editor running at that time (select, edit, export, load), or by the event handler called by Tk.
+
+import functools
+import json
+import time
+import tkinter as tk
+from contextlib import contextmanager
+from tkinter import ttk
+
+current = None #Instrumentation of the editor, None when it is disabled
+
+# Methods of the interpreter timed as calls to Tcl, besides call and eval (variables of the panels)
+timedMethods = {"getvar", "setvar", "globalgetvar", "globalsetvar"}
+
+
+class TclProxy:
+    """
+    Tcl interpreter of the editor (replaces root.tk): call and eval are timed, the Python commands
+    called by Tk are wrapped to time the event handlers. Everything else goes to the interpreter.
+    """
+    def __init__(self, tkapp, instrumentation):
+        self._tkapp = tkapp
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attribute = getattr(self._tkapp, name)
+        if name not in timedMethods:
+            return attribute
+        instrumentation = self._instrumentation
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return attribute(*args)
+            finally:
+                instrumentation.addCall((name,), time.perf_counter() - start)
+        return timed
+
+    def call(self, *args):
+        start = time.perf_counter()
+        try:
+            return self._tkapp.call(*args)
+        finally:
+            self._instrumentation.addCall(args, time.perf_counter() - start)
+
+    def eval(self, script):
+        start = time.perf_counter()
+        try:
+            return self._tkapp.eval(script)
+        finally:
+            self._instrumentation.addCall(tuple(script.split(None, 2)[:2]), time.perf_counter() - start)
+
+    def createcommand(self, name, function):
+        self._tkapp.createcommand(name, self._instrumentation.wrapHandler(function))
+
+
+class Instrumentation:
+    """
+    Statistics of the editor, each one is [count, seconds].
+    Attributes:
+        operations (dict): Statistics by operation.
+        calls (dict): Statistics of the Tcl calls by (operation, command).
+        handlers (dict): Statistics of the event handlers by name.
+        active (str): Operation running, None between operations.
+        dumpPath (str): File written by dump() when the editor is closed, None for no file.
+    Methods:
+        install(root):
+            Replaces the Tcl interpreter of root, must be called before the widgets are created.
+        operation(name):
+            Context manager grouping the calls under an operation.
+        reset():
+            Clears the statistics.
+        dump(path):
+            Writes the statistics to a JSON file.
+    """
+    def __init__(self, dumpPath=None):
+        self.operations = {}
+        self.calls = {}
+        self.handlers = {}
+        self.active = None
+        self.dumpPath = dumpPath
+
+    def install(self, root):
+        root.tk = TclProxy(root.tk, self)
+
+    # -----------------------------------------------------------------------------------------------
+    # Nested operations are counted in the first one (the action of the user)
+    # -----------------------------------------------------------------------------------------------
+    @contextmanager
+    def operation(self, name):
+        if self.active != None:
+            yield
+            return
+        self.active = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.active = None
+            self.add(self.operations, name, time.perf_counter() - start)
+
+    def add(self, statistics, key, duration):
+        stats = statistics.get(key)
+        if stats == None:
+            stats = statistics[key] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += duration
+
+    # -----------------------------------------------------------------------------------------------
+    # Command of a call: the Tcl command and its subcommand ("winfo rootx", "<widget> cget")
+    # -----------------------------------------------------------------------------------------------
+    def addCall(self, args, duration):
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+        command = str(args[0]) if args else ""
+        if command.startswith("."):
+            command = "<widget>"
+        if len(args) > 1 and isinstance(args[1], str) and args[1][:1] not in ("-", ".", "") and " " not in args[1]:
+            command += " " + args[1]
+        self.add(self.calls, (self.active or "(none)", command), duration)
+
+    # -----------------------------------------------------------------------------------------------
+    # Event handler called by Tk, its calls are counted in an operation named after it
+    # when it is not called during an operation
+    # -----------------------------------------------------------------------------------------------
+    def wrapHandler(self, function):
+        #tkinter registers the __call__ method of a CallWrapper holding the function
+        target = getattr(getattr(function, "__self__", None), "func", function)
+        name = getattr(target, "__name__", "handler")
+        @functools.wraps(function)
+        def handler(*args):
+            start = time.perf_counter()
+            try:
+                with self.operation("<" + name + ">"):
+                    return function(*args)
+            finally:
+                self.add(self.handlers, name, time.perf_counter() - start)
+        return handler
+
+    def reset(self):
+        self.operations.clear()
+        self.calls.clear()
+        self.handlers.clear()
+
+    def toData(self):
+        return {"operations": {name: {"count": count, "seconds": seconds} for name, (count, seconds) in self.operations.items()},
+                "calls": [{"operation": operation, "command": command, "count": count, "seconds": seconds}
+                          for (operation, command), (count, seconds) in self.calls.items()],
+                "handlers": {name: {"count": count, "seconds": seconds} for name, (count, seconds) in self.handlers.items()}}
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.toData(), f, indent=1)
+
+
+# -----------------------------------------------------------------------------------------------
+# Enable the instrumentation for the main window, before the widgets are created
+# -----------------------------------------------------------------------------------------------
+def enable(root, dumpPath=None):
+    global current
+    current = Instrumentation(dumpPath)
+    current.install(root)
+    return current
+
+# -----------------------------------------------------------------------------------------------
+# Decorator grouping the calls of a method under an operation, nothing is done when disabled
+# -----------------------------------------------------------------------------------------------
+def instrumented(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if current == None:
+                return function(*args, **kwargs)
+            with current.operation(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StatisticsWindow:
+    """
+    Window displaying the statistics: the operations with their Tcl calls, then the event handlers,
+    sorted by total time.
+    """
+    def __init__(self, root, instrumentation):
+        self.instrumentation = instrumentation
+        self.window = tk.Toplevel(root)
+        self.window.title("Tcl statistics")
+        self.window.geometry("640x480")
+        self.tree = ttk.Treeview(self.window, columns=("count", "total", "mean"))
+        self.tree.heading("#0", text="Operation / command")
+        self.tree.heading("count", text="Calls")
+        self.tree.heading("total", text="Total (ms)")
+        self.tree.heading("mean", text="Mean (us)")
+        for column in ("count", "total", "mean"):
+            self.tree.column(column, width=90, anchor="e")
+        scrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        buttons = tk.Frame(self.window)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X)
+        tk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Dump to file", command=self.dump).pack(side=tk.LEFT)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.refresh()
+
+    def row(self, parent, text, count, seconds):
+        return self.tree.insert(parent, "end", text=text, values=(count, "%.1f" % (seconds * 1000), "%.1f" % (seconds * 1e6 / max(count, 1))))
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        #the statistics are read before the rows are inserted, the insertions are counted too
+        operations = dict(self.instrumentation.operations)
+        calls = dict(self.instrumentation.calls)
+        handlers = dict(self.instrumentation.handlers)
+        commands = {}
+        for (operation, command), stats in calls.items():
+            commands.setdefault(operation, []).append((command, stats))
+        for operation in sorted(set(operations) | set(commands), key=lambda name: -operations.get(name, [0, 0.0])[1]):
+            count, seconds = operations.get(operation, [0, 0.0])
+            item = self.row("", operation, count, seconds)
+            for command, (count, seconds) in sorted(commands.get(operation, []), key=lambda item: -item[1][1]):
+                self.row(item, command, count, seconds)
+        item = self.row("", "event handlers", sum(stats[0] for stats in handlers.values()), sum(stats[1] for stats in handlers.values()))
+        for name, (count, seconds) in sorted(handlers.items(), key=lambda item: -item[1][1]):
+            self.row(item, name, count, seconds)
+
+    def reset(self):
+        self.instrumentation.reset()
+        self.refresh()
+
+    def dump(self):
+        from tkinter.filedialog import asksaveasfilename
+        path = asksaveasfilename(parent=self.window, title="Enter à file:", defaultextension=".json",
+                                 filetypes=[("JSON file", "*.json")])
+        if path:
+            self.instrumentation.dump(path)
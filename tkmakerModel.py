@@ -0,0 +1,181 @@
+# Description: Document model of a design, independent of Tk
+
+import itertools
+
+# Layout methods of a node (same values as the layout radio buttons of the editor)
+# A widget added in a Notebook is managed as a tab of its parent
+LAYOUT_PLACE = 1
+LAYOUT_GRID = 2
+LAYOUT_PACK = 3
+LAYOUT_TAB = 4
+
+# Aliases of the Tk options, a node only keeps the option they stand for
+optionAliases = {"bd": "borderwidth", "bg": "background", "fg": "foreground",
+                 "invcmd": "invalidcommand", "vcmd": "validatecommand"}
+
+# Versions given to the nodes, never reused even by another document, so a version identifies
+# the content of a node in the caches of the code generation
+versions = itertools.count(1)
+
+
+class WidgetNode:
+    """
+    A widget of the design.
+    Only the options that differ from the defaults of the class are stored, so a node stays small
+    and the code generation only has to write what is in the node.
+    Attributes:
+        id (int): Identifier of the node in its document.
+        widgetClass (str): Name of the tkinter/ttk class used to create the widget (WidgetType value).
+        name (str): Name of the widget, used as variable name in the generated code.
+        parent (WidgetNode): Parent node, None when the widget is placed in the drawing frame.
+        children (list): Child nodes in creation order.
+        options (dict): Options that differ from the class defaults, by their full name (not bg).
+        layout (int): Layout method (LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK or LAYOUT_TAB).
+        layoutOptions (dict): Layout options that differ from the defaults of the layout method.
+        version (int): Changed by the document each time the node is changed.
+    """
+    __slots__ = ("id", "widgetClass", "name", "parent", "children", "options", "layout", "layoutOptions", "version")
+
+    def __init__(self, id, widgetClass, name, parent=None, layout=LAYOUT_PLACE, options=None, layoutOptions=None):
+        self.id = id
+        self.widgetClass = widgetClass
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.options = dict(options) if options else {}
+        self.layout = layout
+        self.layoutOptions = dict(layoutOptions) if layoutOptions else {}
+        self.version = 0
+
+    def __repr__(self):
+        return "WidgetNode(%d, %s, %s)" % (self.id, self.widgetClass, self.name)
+
+
+class Document:
+    """
+    The design edited by TkMaker: a tree of WidgetNode.
+    The editor keeps it in sync with the widgets, so the export and the save never need Tk.
+    Attributes:
+        nodes (dict): Nodes of the design by id, in creation order. The ids are never reused.
+        names (dict): Nodes of the design by name.
+        roots (list): Nodes placed directly in the drawing frame.
+        version (int): Last version given by the document, changed by every change of the design.
+    Methods:
+        addNode(widgetClass, name, parent=None, layout=LAYOUT_PLACE, options=None, layoutOptions=None, id=None, index=None):
+            Creates a node and adds it to the document, at the end of its siblings by default.
+        removeNode(node):
+            Removes a node (and its children) from the document.
+        setOption(node, key, value):
+            Sets an option override, None removes it.
+        setLayout(node, layout, layoutOptions):
+            Sets the layout method and the layout option overrides of a node.
+        rename(node, name):
+            Changes the name of a node.
+        findByName(name):
+            Returns the node with this name or None.
+        hasName(name):
+            Tells if a node already has this name.
+        uniqueName(prefix, reserved=()):
+            Returns a name made of the prefix and a number, not used by any node nor in reserved.
+        walk():
+            Iterates over the nodes, parents before children.
+        touch(node):
+            Gives a new version to a changed node (done by the methods above).
+        clear():
+            Removes every node.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.names = {}
+        self.roots = []
+        self.nextId = 1
+        self.version = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def addNode(self, widgetClass, name, parent=None, layout=LAYOUT_PLACE, options=None, layoutOptions=None, id=None, index=None):
+        #a node removed then restored (undo) keeps its id and its position in its parent
+        if id is None:
+            id = self.nextId
+        self.nextId = max(self.nextId, id + 1)
+        node = WidgetNode(id, widgetClass, name, parent, layout, canonicalOptions(options), layoutOptions)
+        self.touch(node)
+        self.nodes[node.id] = node
+        self.names[name] = node
+        siblings = self.roots if parent is None else parent.children
+        if index is None:
+            siblings.append(node)
+        else:
+            siblings.insert(index, node)
+        return node
+
+    def removeNode(self, node):
+        for child in list(node.children):
+            self.removeNode(child)
+        if node.parent is None:
+            self.roots.remove(node)
+        else:
+            node.parent.children.remove(node)
+        del self.nodes[node.id]
+        del self.names[node.name]
+        self.touch(node)
+
+    def setOption(self, node, key, value):
+        key = optionAliases.get(key, key)
+        if value is None:
+            node.options.pop(key, None)
+        else:
+            node.options[key] = value
+        self.touch(node)
+
+    def setLayout(self, node, layout, layoutOptions):
+        node.layout = layout
+        node.layoutOptions = dict(layoutOptions)
+        self.touch(node)
+
+    def rename(self, node, name):
+        del self.names[node.name]
+        node.name = name
+        self.names[name] = node
+        self.touch(node)
+
+    def touch(self, node):
+        node.version = self.version = next(versions)
+
+    def findByName(self, name):
+        return self.names.get(name)
+
+    def hasName(self, name):
+        return name in self.names
+
+    def uniqueName(self, prefix, reserved=()):
+        number = self.nextId
+        while prefix + str(number) in self.names or prefix + str(number) in reserved:
+            number += 1
+        return prefix + str(number)
+
+    def walk(self):
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def clear(self):
+        self.nodes.clear()
+        self.names.clear()
+        self.roots.clear()
+        self.version = next(versions)
+        self.nextId = 1
+
+
+# -----------------------------------------------------------------------------------------------
+# Options with the aliases replaced by the option they stand for (the full name wins if both are set)
+# -----------------------------------------------------------------------------------------------
+def canonicalOptions(options):
+    if not options:
+        return options
+    result = {optionAliases[key]: value for key, value in options.items() if key in optionAliases}
+    result.update((key, value) for key, value in options.items() if key not in optionAliases)
+    return result
@@ -0,0 +1,58 @@
+# Description: Window displaying the code generated from the document
+# The text is filled from the chunks of tkmakerCodegen.iterCode, as the export writes its file
+
+import tkinter as tk
+from tkinter import ttk
+
+import tkmakerCodegen
+
+INSERT_CHUNKS = 64 #Number of chunks inserted in the text by each call to Tk
+
+modes = ["EXPORT", "BACKUP", "TCL"]
+
+
+class CodePreview:
+    """
+    Window displaying the code of the design in one of the export modes.
+    Attributes:
+        getDocument (callable): Returns the design of the editor, called by each refresh() as the
+            editor replaces its document when a file is opened.
+        getLazyTabs (callable): Tells if the exported code builds the Notebook tabs when they are selected.
+    Methods:
+        refresh():
+            Generates the code again in the selected mode.
+    """
+    def __init__(self, root, getDocument, getLazyTabs=lambda: False):
+        self.getDocument = getDocument
+        self.getLazyTabs = getLazyTabs
+        self.window = tk.Toplevel(root)
+        self.window.title("Code preview")
+        self.window.geometry("800x600")
+        self.mode = tk.StringVar(self.window, value=modes[0])
+        buttons = tk.Frame(self.window)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X)
+        combo = ttk.Combobox(buttons, textvariable=self.mode, values=modes, state="readonly", width=10)
+        combo.pack(side=tk.LEFT)
+        combo.bind("<<ComboboxSelected>>", lambda event: self.refresh())
+        tk.Button(buttons, text="Refresh", command=self.refresh).pack(side=tk.LEFT)
+        self.text = tk.Text(self.window, wrap=tk.NONE, font="TkFixedFont")
+        yscrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.text.yview)
+        xscrollbar = ttk.Scrollbar(self.window, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(yscrollcommand=yscrollbar.set, xscrollcommand=xscrollbar.set)
+        xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        yscrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.refresh()
+
+    def refresh(self):
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        #the chunks are grouped, so a big design does not need one insertion for each widget
+        chunks = []
+        for chunk in tkmakerCodegen.iterCode(self.getDocument(), self.mode.get(), self.getLazyTabs()):
+            chunks.append(chunk)
+            if len(chunks) == INSERT_CHUNKS:
+                self.text.insert(tk.END, "".join(chunks))
+                chunks.clear()
+        self.text.insert(tk.END, "".join(chunks))
+        self.text.configure(state=tk.DISABLED)
@@ -0,0 +1,146 @@
+# Description: TkMaker project files (.tkm)
+# A project is a JSON description of the document: it is only read, never executed
+#
+# {"format": "tkmaker", "version": 1,
+#  "widgets": [{"class": "Frame", "name": "frm_main", "layout": 1,
+#               "options": {"bg": "red"}, "layoutOptions": {"x": "10"},
+#               "children": [...]}]}
+#
+# Empty "options", "layoutOptions" and "children" are not written
+
+import json
+import keyword
+
+from tkmakerConfig import WidgetType, containerClasses
+from tkmakerFiles import replaceFile
+from tkmakerModel import Document, LAYOUT_PLACE, LAYOUT_TAB
+
+PROJECT_FORMAT = "tkmaker"
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = ".tkm"
+
+widgetClasses = {widget.value for widget in WidgetType} #Classes allowed in a project
+
+
+# -----------------------------------------------------------------------------------------------
+# Convert a document to the data written in a project file
+# -----------------------------------------------------------------------------------------------
+def documentToData(document):
+    widgets = []
+    #the children lists are filled while walking, parents are always visited first
+    containers = {}
+    for node in document.walk():
+        item = {"class": node.widgetClass, "name": node.name, "layout": node.layout}
+        if node.options:
+            item["options"] = node.options
+        if node.layoutOptions:
+            item["layoutOptions"] = node.layoutOptions
+        if node.parent is None:
+            widgets.append(item)
+        else:
+            containers[node.parent.id].setdefault("children", []).append(item)
+        containers[node.id] = item
+    return {"format": PROJECT_FORMAT, "version": PROJECT_VERSION, "widgets": widgets}
+
+# -----------------------------------------------------------------------------------------------
+# Convert the data of a project file to a document
+# Raises ValueError if the data is not a valid project
+# -----------------------------------------------------------------------------------------------
+def documentFromData(data):
+    if not isinstance(data, dict) or data.get("format") != PROJECT_FORMAT:
+        raise ValueError("Not a TkMaker project")
+    if not isinstance(data.get("version"), int) or data["version"] > PROJECT_VERSION:
+        raise ValueError("The project was saved by a newer version of TkMaker")
+
+    document = Document()
+    names = set()
+    #the stack is reversed so the widgets are created in the order of the file
+    stack = [(item, None) for item in reversed(listField(data, "widgets"))]
+    while stack:
+        item, parent = stack.pop()
+        if not isinstance(item, dict):
+            raise ValueError("Invalid widget description: %r" % (item,))
+        widgetclass = item.get("class")
+        name = item.get("name")
+        layout = item.get("layout", LAYOUT_PLACE)
+        options = item.get("options", {})
+        layoutOptions = item.get("layoutOptions", {})
+        if widgetclass not in widgetClasses:
+            raise ValueError("Unknown widget class: %r" % (widgetclass,))
+        if not isinstance(name, str) or name == "" or name in names:
+            raise ValueError("Invalid or duplicated widget name: %r" % (name,))
+        if layout not in (1, 2, 3, LAYOUT_TAB):
+            raise ValueError("Invalid layout for %s: %r" % (name, layout))
+        checkNode(widgetclass, name, parent, layout)
+        if not validOptions(options) or not validOptions(layoutOptions):
+            raise ValueError("Invalid options for %s" % name)
+        names.add(name)
+        node = document.addNode(widgetclass, name, parent, layout,
+                                {key: str(value) for key, value in options.items()},
+                                {key: str(value) for key, value in layoutOptions.items()})
+        stack.extend((child, node) for child in reversed(listField(item, "children")))
+    return document
+
+# -----------------------------------------------------------------------------------------------
+# Check that a widget can be created in its parent (also used for the backups)
+# The name is an attribute of the generated code, only the containers have children and the
+# children of a Notebook are its tabs. Raises ValueError
+# -----------------------------------------------------------------------------------------------
+def checkNode(widgetclass, name, parent, layout):
+    if not name.isidentifier() or keyword.iskeyword(name):
+        raise ValueError("Invalid widget name: %r" % (name,))
+    if parent != None and parent.widgetClass not in containerClasses:
+        raise ValueError("%s can not contain widgets (%s)" % (parent.name, name))
+    if parent != None and parent.widgetClass == "Notebook":
+        if layout != LAYOUT_TAB:
+            raise ValueError("%s must be a tab of the Notebook %s" % (name, parent.name))
+    elif layout == LAYOUT_TAB:
+        raise ValueError("%s is a tab but its parent is not a Notebook" % name)
+
+# -----------------------------------------------------------------------------------------------
+# List of a field of the data (empty when missing), raises ValueError if it is not a list
+# -----------------------------------------------------------------------------------------------
+def listField(item, key):
+    value = item.get(key, [])
+    if not isinstance(value, list):
+        raise ValueError("Invalid %s list: %r" % (key, value))
+    return value
+
+# -----------------------------------------------------------------------------------------------
+# Tells if options are a dict of option names with simple values (text, number, boolean)
+# -----------------------------------------------------------------------------------------------
+def validOptions(options):
+    if not isinstance(options, dict):
+        return False
+    return all(isinstance(key, str) and key != "" and isinstance(value, (str, int, float, bool))
+               for key, value in options.items())
+
+# -----------------------------------------------------------------------------------------------
+# Write a document to an open file
+# -----------------------------------------------------------------------------------------------
+def writeProject(document, f):
+    json.dump(documentToData(document), f, separators=(",", ":"))
+
+# -----------------------------------------------------------------------------------------------
+# Read a document from an open file
+# -----------------------------------------------------------------------------------------------
+def readProject(f):
+    try:
+        data = json.load(f)
+    except json.JSONDecodeError as error:
+        raise ValueError("Invalid project file: %s" % error)
+    return documentFromData(data)
+
+# -----------------------------------------------------------------------------------------------
+# Save a document to a project file, the previous file is only replaced once the new one is written
+# -----------------------------------------------------------------------------------------------
+def saveProject(document, path):
+    with replaceFile(path) as f:
+        writeProject(document, f)
+
+# -----------------------------------------------------------------------------------------------
+# Load a document from a project file
+# -----------------------------------------------------------------------------------------------
+def loadProject(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return readProject(f)
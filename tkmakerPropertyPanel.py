@@ -0,0 +1,273 @@
+# Description: Panel of rows (label + entry) used to display and edit the options of the selected widget
+
+import tkinter as tk
+from tkinter import ttk
+from types import SimpleNamespace
+
+from tkmakerTooltip import CreateToolTip
+
+
+class PropertyRow:
+    """
+    A row of the panel: a label and an entry or a combobox sharing the same variable.
+    The row is bound to an option (key) and rebound to another one when the panel scrolls.
+    """
+    __slots__ = ("label", "entry", "combobox", "variable", "tooltip", "key", "iscombobox", "active")
+
+    def __init__(self, label, entry, combobox, variable, tooltip):
+        self.label = label
+        self.entry = entry
+        self.combobox = combobox
+        self.variable = variable
+        self.tooltip = tooltip
+        self.key = None
+        self.iscombobox = False
+        self.active = True
+
+
+class PropertyPanel:
+    """
+    Scrollable rows displaying the options of a widget in a frame.
+    Only the rows visible in the panel are built (plus one partially visible row). They are kept
+    between selections, and scrolling or displaying another widget only rebinds them to other options,
+    so the cost of the panel does not depend on the number of options of the widget class.
+    Attributes:
+        frame (tk.Frame): Frame containing the panel.
+        row (int): Grid row of the panel in the frame.
+        choices (dict): Options displayed with a combobox and their predefined values.
+        onchange (function): Handler called when an entry is changed.
+        entrylist (dict): Option of each entry by entry path, updated when a row is rebound.
+        colors (list): Options edited with the color picker.
+        oncolor (function): Handler called by a double click on a color entry.
+        items (list): Options displayed as (key, value).
+        first (int): Index of the first displayed option.
+        visible (int): Number of rows fitting in the panel.
+        rows (list): Rows already built.
+    Methods:
+        show(kind, items):
+            Displays the options of items (list of (key, value)), kind is the widget class or layout method.
+        hide():
+            Hides the panel.
+        displays(entry):
+            Tells if an entry belongs to a row currently displayed.
+        yview(*args):
+            Scrolls the panel (command of the scrollbar).
+    """
+    def __init__(self, frame, row, choices, onchange, entrylist, colors=(), oncolor=None,
+                 labelwidth=None, entrywidth=None, comboboxwidth=17):
+        self.frame = frame
+        self.row = row
+        self.choices = choices
+        self.onchange = onchange
+        self.entrylist = entrylist
+        self.colors = colors
+        self.oncolor = oncolor
+        self.labelwidth = labelwidth
+        self.entrywidth = entrywidth
+        self.comboboxwidth = comboboxwidth
+        self.kind = None
+        self.items = []
+        self.first = 0
+        self.visible = 1
+        self.rows = []
+        self.rowheight = 0
+        self.shown = False
+
+        #the panel takes the remaining height of the frame
+        frame.grid_rowconfigure(row, weight=1)
+        self.container = tk.Frame(frame)
+        self.scrollbar = ttk.Scrollbar(self.container, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.rowframe = tk.Frame(self.container)
+        self.rowframe.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.container.bind("<Configure>", self.resize)
+        for widget in (self.container, self.rowframe):
+            self.bindWheel(widget)
+
+    # -----------------------------------------------------------------------------------------------
+    # Scrolling with the mouse wheel over the panel
+    # -----------------------------------------------------------------------------------------------
+    def bindWheel(self, widget):
+        widget.bind("<MouseWheel>", self.wheel)
+        widget.bind("<Button-4>", self.wheel)
+        widget.bind("<Button-5>", self.wheel)
+
+    def wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scrollTo(self.first - 1)
+        else:
+            self.scrollTo(self.first + 1)
+        #the combobox must not change its value
+        return "break"
+
+    # -----------------------------------------------------------------------------------------------
+    # Build a row, the entry and the combobox share the variable so a value is set in one call
+    # -----------------------------------------------------------------------------------------------
+    def buildRow(self):
+        i = len(self.rows)
+        variable = tk.StringVar(self.frame)
+        labeloptions = {"anchor": "w"}
+        if self.labelwidth:
+            labeloptions["width"] = self.labelwidth
+        entryoptions = {}
+        if self.entrywidth:
+            entryoptions["width"] = self.entrywidth
+        label = tk.Label(self.rowframe, **labeloptions)
+        label.grid(row=i, column=0, sticky=tk.W)
+        entry = tk.Entry(self.rowframe, textvariable=variable, **entryoptions)
+        entry.bind("<FocusOut>", self.onchange)
+        entry.bind("<Double-Button-1>", self.colorclick)
+        entry.grid(row=i, column=1, sticky=tk.W)
+        combobox = ttk.Combobox(self.rowframe, width=self.comboboxwidth, textvariable=variable)
+        combobox.bind("<<ComboboxSelected>>", self.onchange)
+        combobox.grid(row=i, column=1, sticky=tk.W)
+        combobox.grid_remove()
+        tooltip = CreateToolTip(entry, text="")
+        for widget in (label, entry, combobox):
+            self.bindWheel(widget)
+        row = PropertyRow(label, entry, combobox, variable, tooltip)
+        self.rows.append(row)
+        #all the rows have the same height, so the first index of a scroll position is easy to compute
+        if self.rowheight == 0:
+            self.rowheight = max(entry.winfo_reqheight(), combobox.winfo_reqheight())
+        self.rowframe.grid_rowconfigure(i, minsize=self.rowheight)
+        return row
+
+    # -----------------------------------------------------------------------------------------------
+    # Bind a row to an option, the widgets are only reconfigured when the option changes
+    # -----------------------------------------------------------------------------------------------
+    def bindRow(self, row, key, value):
+        if row.key != key:
+            row.label.configure(text=key)
+            #If the parameter is in the list of predefined values we display a combobox
+            if key in self.choices:
+                row.combobox.configure(values=self.choices[key])
+                if not row.iscombobox:
+                    row.entry.grid_remove()
+                    row.combobox.grid()
+                    row.iscombobox = True
+            elif row.iscombobox:
+                row.combobox.grid_remove()
+                row.entry.grid()
+                row.iscombobox = False
+            row.tooltip.text = "Double click to chose a color" if key in self.colors else ""
+            row.key = key
+            self.entrylist[str(row.entry)] = key
+            self.entrylist[str(row.combobox)] = key
+        row.variable.set(value)
+        if not row.active:
+            row.label.grid()
+            (row.combobox if row.iscombobox else row.entry).grid()
+            row.active = True
+
+    def unbindRow(self, row):
+        if row.active:
+            row.label.grid_remove()
+            (row.combobox if row.iscombobox else row.entry).grid_remove()
+            row.active = False
+
+    # -----------------------------------------------------------------------------------------------
+    # Display the options of items, built rows are reused
+    # -----------------------------------------------------------------------------------------------
+    def show(self, kind, items):
+        if kind != self.kind:
+            self.first = 0
+            self.kind = kind
+        self.items = items
+        if not self.shown:
+            self.container.grid(row=self.row, column=0, columnspan=2, sticky=(tk.N, tk.S, tk.W, tk.E))
+            self.shown = True
+        self.refresh()
+
+    # -----------------------------------------------------------------------------------------------
+    # Hide the panel
+    # -----------------------------------------------------------------------------------------------
+    def hide(self):
+        if self.shown:
+            self.container.grid_remove()
+            self.shown = False
+
+    # -----------------------------------------------------------------------------------------------
+    # Fill the visible rows from the first displayed option
+    # -----------------------------------------------------------------------------------------------
+    def refresh(self):
+        self.first = max(0, min(self.first, len(self.items) - self.visible))
+        count = min(self.visible, len(self.items) - self.first)
+        while len(self.rows) < count:
+            self.buildRow()
+        for i, row in enumerate(self.rows):
+            if i < count:
+                key, value = self.items[self.first + i]
+                self.bindRow(row, key, value)
+            else:
+                self.unbindRow(row)
+        total = len(self.items)
+        if total > 0:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # -----------------------------------------------------------------------------------------------
+    # Apply the entry being edited before its row is rebound to another option
+    # -----------------------------------------------------------------------------------------------
+    def commitFocus(self):
+        try:
+            focus = self.frame.focus_get()
+        except KeyError:
+            #the focus is in a window created by Tk (the list of a combobox)
+            return
+        for row in self.rows:
+            if row.active and focus in (row.entry, row.combobox):
+                self.onchange(SimpleNamespace(widget=focus))
+                return
+
+    # -----------------------------------------------------------------------------------------------
+    # The number of visible rows depends on the height of the panel
+    # -----------------------------------------------------------------------------------------------
+    def resize(self, event):
+        if self.rowheight == 0:
+            self.buildRow()
+        #one more row for the partially visible one at the bottom
+        visible = max(1, event.height // self.rowheight + 1)
+        if visible != self.visible:
+            self.visible = visible
+            if self.shown:
+                self.refresh()
+
+    # -----------------------------------------------------------------------------------------------
+    # Scroll the panel (command of the scrollbar)
+    # -----------------------------------------------------------------------------------------------
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scrollTo(int(round(float(args[1]) * len(self.items))))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.visible - 1)
+            self.scrollTo(self.first + step)
+
+    def scrollTo(self, first):
+        first = max(0, min(first, len(self.items) - self.visible))
+        if first != self.first:
+            self.commitFocus()
+            self.first = first
+            self.refresh()
+
+    # -----------------------------------------------------------------------------------------------
+    # Double click on an entry, only the color options open the color picker
+    # -----------------------------------------------------------------------------------------------
+    def colorclick(self, event):
+        if self.oncolor and self.displays(event.widget) and self.entrylist.get(str(event.widget)) in self.colors:
+            return self.oncolor(event)
+
+    # -----------------------------------------------------------------------------------------------
+    # Tell if an entry belongs to a row currently displayed
+    # A hidden entry can still receive a FocusOut after the selection changed
+    # -----------------------------------------------------------------------------------------------
+    def displays(self, entry):
+        if not self.shown:
+            return False
+        for row in self.rows:
+            if row.active and (entry is row.entry or entry is row.combobox):
+                return True
+        return False
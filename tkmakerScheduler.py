@@ -0,0 +1,63 @@
+# Description: Deferred refresh of the parts of the editor, done once when Tk is idle
+
+from contextlib import contextmanager
+
+
+class RedrawScheduler:
+    """
+    Collects the parts (regions) of the editor that must be refreshed and refreshes them once,
+    when Tk is idle, instead of forcing a full update after each change.
+    Attributes:
+        widget (tk.Widget): Widget used to schedule the refresh (after_idle).
+        handlers (dict): Function refreshing each region.
+        dirty (list): Regions waiting for a refresh, in the order they were marked.
+        job: Pending after_idle call, None if nothing is scheduled.
+        batchLevel (int): Number of nested batches, nothing is refreshed while it is not 0.
+    Methods:
+        register(region, handler):
+            Sets the function refreshing a region.
+        markDirty(region):
+            Marks a region to be refreshed.
+        flush():
+            Refreshes the dirty regions now.
+        batch():
+            Context manager suspending the refreshes until the end of the batch.
+    """
+    def __init__(self, widget):
+        self.widget = widget
+        self.handlers = {}
+        self.dirty = []
+        self.job = None
+        self.batchLevel = 0
+
+    def register(self, region, handler):
+        self.handlers[region] = handler
+
+    def markDirty(self, region):
+        if region not in self.dirty:
+            self.dirty.append(region)
+        self.schedule()
+
+    def schedule(self):
+        if self.job == None and self.batchLevel == 0 and self.dirty:
+            self.job = self.widget.after_idle(self.flush)
+
+    def flush(self):
+        if self.job != None:
+            self.widget.after_cancel(self.job)
+            self.job = None
+        if self.batchLevel > 0:
+            return
+        #a handler can mark another region, it is refreshed in the same flush
+        while self.dirty:
+            region = self.dirty.pop(0)
+            self.handlers[region]()
+
+    @contextmanager
+    def batch(self):
+        self.batchLevel += 1
+        try:
+            yield self
+        finally:
+            self.batchLevel -= 1
+            self.schedule()
@@ -0,0 +1,26 @@
+# Description: Options of a widget read in a single call to Tk
+# configure() without argument returns every option of a widget with its value, instead of one cget
+# call for each option
+
+class OptionSnapshot:
+    """
+    Values of all the options of a widget at the time of the snapshot, as strings.
+    The aliases (bd, bg, fg...) are left out, only the option they stand for is kept, so a change
+    is seen once.
+    Attributes:
+        values (dict): Value of each option, in the order of Tk.
+    Methods:
+        changed(reference):
+            Returns the options whose value differs from reference (dict of strings).
+    """
+    __slots__ = ("values",)
+
+    def __init__(self, widget):
+        self.values = {}
+        #each option is (name, database name, database class, default, value), an alias is (name, -target)
+        for key, item in widget.configure().items():
+            if len(item) != 2:
+                self.values[key] = str(item[4])
+
+    def changed(self, reference):
+        return {key: value for key, value in self.values.items() if value != reference.get(key)}
@@ -0,0 +1,57 @@
+# Description: Spatial index of the rectangles of the widgets, used to find the widget under the mouse
+# The rectangles are stored in the cells of a grid, so a point or a region only tests the
+# rectangles of the cells it covers instead of every widget of the design
+
+CELL_SIZE = 64 #Size of the cells of the grid (pixels)
+
+
+class SpatialIndex:
+    """
+    Rectangles (x, y, width, height) by key, in drawing order: a rectangle added after another one
+    is drawn over it (children after their parent, then the next siblings).
+    Attributes:
+        cells (dict): Rectangles of each cell of the grid, as (order, key, x, y, width, height).
+        count (int): Number of rectangles.
+    Methods:
+        rebuild(rectangles):
+            Replaces the rectangles with (key, x, y, width, height) items, in drawing order.
+        hit(x, y):
+            Returns the key of the topmost rectangle containing the point, None if there is none.
+        query(x0, y0, x1, y1):
+            Returns the keys of the rectangles inside the region, in drawing order.
+    """
+    def __init__(self):
+        self.cells = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def rebuild(self, rectangles):
+        self.cells = {}
+        self.count = 0
+        for key, x, y, width, height in rectangles:
+            item = (self.count, key, x, y, width, height)
+            self.count += 1
+            for cx in range(x // CELL_SIZE, (x + max(width, 1) - 1) // CELL_SIZE + 1):
+                for cy in range(y // CELL_SIZE, (y + max(height, 1) - 1) // CELL_SIZE + 1):
+                    self.cells.setdefault((cx, cy), []).append(item)
+
+    def hit(self, x, y):
+        found = None
+        for item in self.cells.get((x // CELL_SIZE, y // CELL_SIZE), ()):
+            order, key, rx, ry, width, height = item
+            if rx <= x < rx + width and ry <= y < ry + height and (found == None or order > found[0]):
+                found = item
+        return None if found == None else found[1]
+
+    def query(self, x0, y0, x1, y1):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        found = {}
+        for cx in range(x0 // CELL_SIZE, x1 // CELL_SIZE + 1):
+            for cy in range(y0 // CELL_SIZE, y1 // CELL_SIZE + 1):
+                for order, key, x, y, width, height in self.cells.get((cx, cy), ()):
+                    if x >= x0 and y >= y0 and x + width <= x1 and y + height <= y1:
+                        found[order] = key
+        return [found[order] for order in sorted(found)]
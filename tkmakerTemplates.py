@@ -0,0 +1,122 @@
+# Description: Collection of layouts added in one step under a Frame (or the drawing frame)
+# A template is a tree of widgets: (class, name, layout, options, layoutOptions, children)
+# It is checked once, the first time it is used, and kept as the list of specs given to
+# MainWindow.add_widgets. Only the names are changed when it is added to a document.
+
+from tkmakerConfig import containerClasses
+from tkmakerModel import LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK, LAYOUT_TAB
+from tkmakerProject import widgetClasses
+
+FORM_ROWS = 12 #Number of label + entry rows of the form templates
+
+templateCache = {} #Checked templates by name: tuple of specs
+
+
+# -----------------------------------------------------------------------------------------------
+# Widgets of the templates
+# -----------------------------------------------------------------------------------------------
+def headerTemplate():
+    return [("Frame", "frm_header", LAYOUT_PACK, {"bg": "#446", "height": "50"}, {"side": "top", "fill": "x"}, [
+                ("Label", "lbl_title", LAYOUT_PACK, {"text": "Title", "bg": "#446", "fg": "white"}, {"side": "left", "padx": "10"}, [])]),
+            ("Frame", "frm_body", LAYOUT_PACK, {}, {"side": "top", "fill": "both", "expand": "1"}, [])]
+
+def footerTemplate():
+    return [("Frame", "frm_body", LAYOUT_PACK, {}, {"side": "top", "fill": "both", "expand": "1"}, []),
+            ("Frame", "frm_footer", LAYOUT_PACK, {"bg": "#ccc", "height": "30"}, {"side": "bottom", "fill": "x"}, [
+                ("Label", "lbl_status", LAYOUT_PACK, {"text": "Ready", "bg": "#ccc"}, {"side": "left", "padx": "5"}, [])])]
+
+def sidebarTemplate(side):
+    return [("Frame", "frm_sidebar", LAYOUT_PACK, {"bg": "#ddd", "width": "150"}, {"side": side, "fill": "y"}, [
+                ("Button", "btn_menu" + str(i), LAYOUT_PACK, {"text": "Menu " + str(i)}, {"fill": "x", "padx": "5", "pady": "2"}, [])
+                for i in range(1, 5)]),
+            ("Frame", "frm_body", LAYOUT_PACK, {}, {"side": side, "fill": "both", "expand": "1"}, [])]
+
+def formTemplate():
+    fields = []
+    for i in range(1, FORM_ROWS + 1):
+        fields.append(("Label", "lbl_field" + str(i), LAYOUT_GRID, {"text": "Field " + str(i)}, {"row": str(i - 1), "sticky": "w", "padx": "5", "pady": "2"}, []))
+        fields.append(("Entry", "ent_field" + str(i), LAYOUT_GRID, {}, {"row": str(i - 1), "column": "1", "sticky": "ew", "padx": "5", "pady": "2"}, []))
+    fields.append(("Frame", "frm_buttons", LAYOUT_GRID, {}, {"row": str(FORM_ROWS), "column": "1", "sticky": "e", "pady": "5"}, [
+        ("Button", "btn_ok", LAYOUT_PACK, {"text": "OK", "width": "8"}, {"side": "left", "padx": "2"}, []),
+        ("Button", "btn_cancel", LAYOUT_PACK, {"text": "Cancel", "width": "8"}, {"side": "left", "padx": "2"}, [])]))
+    return [("Frame", "frm_form", LAYOUT_PACK, {}, {"fill": "both", "expand": "1", "padx": "10", "pady": "10"}, fields)]
+
+def applicationTemplate():
+    header, = [node for node in headerTemplate() if node[1] == "frm_header"]
+    footer, = [node for node in footerTemplate() if node[1] == "frm_footer"]
+    sidebar, body = sidebarTemplate("left")
+    return [header, footer, sidebar, body]
+
+# Templates of the menu: name -> (icon, function returning the widgets)
+templates = {"Header": ("layout-top-fill", headerTemplate),
+             "Footer": ("layout-bottom-fill", footerTemplate),
+             "Left sidebar": ("layout-left-fill", lambda: sidebarTemplate("left")),
+             "Right sidebar": ("layout-right-fill", lambda: sidebarTemplate("right")),
+             "Form": ("layout-grid-fill", formTemplate),
+             "Application": ("layout-fill", applicationTemplate)}
+
+
+# -----------------------------------------------------------------------------------------------
+# Check the layout methods of the children of a container
+# -----------------------------------------------------------------------------------------------
+def checkLayouts(children, parent, parentclass):
+    layouts = {child[2] for child in children}
+    if parentclass == "Notebook":
+        if layouts - {LAYOUT_TAB}:
+            raise ValueError("The children of %s must be tabs" % parent)
+    elif len(layouts) > 1 or layouts - {LAYOUT_PLACE, LAYOUT_GRID, LAYOUT_PACK}:
+        raise ValueError("The children of %s must use the same layout method" % (parent or "the template"))
+
+# -----------------------------------------------------------------------------------------------
+# Check the widgets of a template and convert them to specs, parents first
+# Raises ValueError if the template is not valid
+# -----------------------------------------------------------------------------------------------
+def buildSpecs(widgets):
+    specs = []
+    names = set()
+    checkLayouts(widgets, None, None)
+    #the stack is reversed so the widgets are added in the order of the template
+    stack = [(widget, None) for widget in reversed(widgets)]
+    while stack:
+        (widgetclass, name, layout, options, layoutOptions, children), parent = stack.pop()
+        if widgetclass not in widgetClasses:
+            raise ValueError("Unknown widget class: %r" % (widgetclass,))
+        if name in names:
+            raise ValueError("Duplicated widget name: %r" % (name,))
+        if children and widgetclass not in containerClasses:
+            raise ValueError("%s can not contain other widgets" % name)
+        checkLayouts(children, name, widgetclass)
+        names.add(name)
+        specs.append({"type": widgetclass, "name": name, "parent": parent, "layout": layout,
+                      "options": options, "layoutOptions": layoutOptions})
+        stack.extend((child, name) for child in reversed(children))
+    return tuple(specs)
+
+# -----------------------------------------------------------------------------------------------
+# Specs of a template, checked once and kept in memory
+# -----------------------------------------------------------------------------------------------
+def getTemplate(name):
+    specs = templateCache.get(name)
+    if specs == None:
+        icon, function = templates[name]
+        specs = buildSpecs(function())
+        templateCache[name] = specs
+    return specs
+
+# -----------------------------------------------------------------------------------------------
+# Specs to add a template to a document, the names already used in the document get a number
+# -----------------------------------------------------------------------------------------------
+def instantiate(name, document):
+    renamed = {}
+    used = set()
+    specs = []
+    for spec in getTemplate(name):
+        widgetname = spec["name"]
+        number = 0
+        while document.hasName(widgetname) or widgetname in used:
+            number += 1
+            widgetname = spec["name"] + "_" + str(number)
+        used.add(widgetname)
+        renamed[spec["name"]] = widgetname
+        specs.append(dict(spec, name=widgetname, parent=renamed.get(spec["parent"])))
+    return specs
@@ -25,6 +25,9 @@ class CreateToolTip(object):
 
     def schedule(self):
         self.unschedule()
+        #a tooltip without text is not displayed
+        if not self.text:
+            return
         self.id = self.widget.after(self.waittime, self.showtip)
 
     def unschedule(self):